@@ -0,0 +1,148 @@
+"""
+Headless fights between two sides of creatures, to measure and tune the combat rules
+A side is a number of creatures of one species with the given equipment, written e.g. '3xwolf' or
+'Human+LongSword+ChainMail'. Every round, each living creature bumps into a random living enemy, like NPCs do
+in the game, and then lives through the turn. Each fight is seeded, and the fights are spread over worker processes.
+Run e.g. `python arena.py 3xwolf Human+LongSword+ChainMail 2000`
+"""
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+import config
+import game_objects as go
+import items
+import species
+
+
+class Side:
+    def __init__(self, species_name: str, count: int = 1, equipment: tuple[str, ...] = ()):
+        if count < 1:
+            raise ValueError(f"A side needs at least one creature, not {count}!")
+        self.species = find_species(species_name)
+        self.count = count
+        self.equipment = tuple(map(find_item_type, equipment))
+
+    @classmethod
+    def parse(cls, text: str) -> 'Side':
+        """A side from '[count x]species[+item type]...', e.g. '2xwinter wolf' or 'Orc+BattleAxe+RoundShield'"""
+        species_part, *equipment = text.split('+')
+        count, separator, species_name = species_part.partition('x')
+        if not separator or not count.isdigit():
+            count, species_name = '1', species_part
+        return cls(species_name.strip(), int(count), tuple(name.strip() for name in equipment))
+
+    def new_creatures(self) -> list[go.Creature]:
+        creature_type = go.Humanoid if isinstance(self.species, go.HumanoidSpecies) else go.Animal
+        creatures = []
+        for _ in range(self.count):
+            creature = creature_type(self.species)
+            for item_type in self.equipment:
+                creature.swap_equipment(item_type())
+            # Only aggressive creatures attack what they bump into
+            creature._disposition = config.aggressive_disposition
+            creature.hp = creature.max_hp
+            creature.energy = creature.max_energy
+            creatures.append(creature)
+        return creatures
+
+    def __reduce__(self) -> tuple:
+        # The workers look the species and item types up again instead of receiving copies of them
+        return Side, (self.species.name, self.count, tuple(item_type.__name__ for item_type in self.equipment))
+
+    def __str__(self) -> str:
+        return f"{self.count}x{self.species.name}" + ''.join(f"+{item_type.__name__}" for item_type in self.equipment)
+
+
+def find_species(name: str) -> go.Species:
+    for value in vars(species).values():
+        if isinstance(value, go.Species) and value.name.lower() == name.lower():
+            return value
+    raise ValueError(f"Unknown species '{name}'!")
+
+
+def find_item_type(name: str) -> type:
+    item_type = getattr(items, name, None)
+    if not isinstance(item_type, type) or not issubclass(item_type, go.Item):
+        raise ValueError(f"Unknown item type '{name}'!")
+    return item_type
+
+
+def fight(attackers: Side, defenders: Side, seed: int, max_rounds: int = config.arena_max_rounds) -> tuple:
+    """Return the winner (0 for the attackers, 1 for the defenders, None for a draw), the rounds and the survivors"""
+    random.seed(seed)
+    sides = (attackers.new_creatures(), defenders.new_creatures())
+    rounds = 0
+    while rounds < max_rounds and all(sides):
+        rounds += 1
+        order = [(creature, 1 - side) for side, creatures in enumerate(sides) for creature in creatures]
+        random.shuffle(order)
+        for creature, enemy_side in order:
+            if creature.is_dead or not sides[enemy_side]:
+                continue
+            enemy = random.choice(sides[enemy_side])
+            creature.bump_with(enemy)
+            if enemy.is_dead:
+                sides[enemy_side].remove(enemy)
+        for creatures in sides:
+            for creature in creatures:
+                creature.live()
+            creatures[:] = [creature for creature in creatures if not creature.is_dead]
+    winner = None
+    if sides[0] and not sides[1]:
+        winner = 0
+    elif sides[1] and not sides[0]:
+        winner = 1
+    return winner, rounds, len(sides[0]), len(sides[1])
+
+
+def _fight_batch(arguments: tuple) -> list[tuple]:
+    attackers, defenders, seeds, max_rounds = arguments
+    return [fight(attackers, defenders, seed, max_rounds) for seed in seeds]
+
+
+def run_arena(attackers: Side, defenders: Side, fights: int = 1000, workers: Optional[int] = None, seed: int = 0,
+              max_rounds: int = config.arena_max_rounds) -> dict[str, float]:
+    """
+    Fight the sides against each other with the seeds seed..seed + fights - 1, and report the throughput
+    and the outcomes. The outcomes only depend on the seeds, not on the number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = range(seed, seed + fights)
+    # A few batches per worker keep them busy when some fights take longer
+    batch_size = max(1, fights // (workers * 4))
+    batches = [(attackers, defenders, seeds[start:start + batch_size], max_rounds)
+               for start in range(0, fights, batch_size)]
+    start_time = time.perf_counter()
+    if workers == 1:
+        results = [result for batch in batches for result in _fight_batch(batch)]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = [result for batch_results in pool.map(_fight_batch, batches) for result in batch_results]
+    seconds = time.perf_counter() - start_time
+    winners = [result[0] for result in results]
+    return {'fights': fights,
+            'workers': workers,
+            'seconds': seconds,
+            'fights_per_second': fights / seconds,
+            'attacker_win_rate': winners.count(0) / fights,
+            'defender_win_rate': winners.count(1) / fights,
+            'draw_rate': winners.count(None) / fights,
+            'mean_rounds': sum(result[1] for result in results) / fights,
+            'mean_attacker_survivors': sum(result[2] for result in results) / fights,
+            'mean_defender_survivors': sum(result[3] for result in results) / fights}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("Usage: python arena.py ATTACKERS DEFENDERS [FIGHTS] [WORKERS]")
+        sys.exit(1)
+    chosen_attackers, chosen_defenders = Side.parse(sys.argv[1]), Side.parse(sys.argv[2])
+    fight_count = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    worker_count = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    print(f'{chosen_attackers} against {chosen_defenders}')
+    for metric, value in run_arena(chosen_attackers, chosen_defenders, fight_count, worker_count).items():
+        print(f'  {metric}: {value:.3f}')
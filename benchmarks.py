@@ -0,0 +1,702 @@
+"""
+Headless performance benchmarks
+Run all of them with `python benchmarks.py` or pick some by name: `python benchmarks.py screen_layout`
+Add `--json report.json` to also write the results to a file.
+"""
+import json
+import os
+import pickle
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Measure the colored output of a real terminal, even when the benchmarks are piped
+os.environ.setdefault('CLICOLOR_FORCE', '1')
+import utils
+
+
+class HeadlessUI:
+    """A UserInterface stand-in that accepts the display calls without drawing anything"""
+
+    def __init__(self, game=None):
+        self.game = game
+        self.frames = 0
+
+    def display(self, content_dict: dict, cursor_pos: tuple[int, int]) -> bool:
+        self.frames += 1
+        return True
+
+    def is_top(self, window) -> bool:
+        return True
+
+    def add_window(self, window) -> bool:
+        return True
+
+    def drop_window(self, window) -> bool:
+        return True
+
+
+def new_headless_game(seed: int = 0):
+    """Start a game with the first available race, skipping the welcome screens"""
+    from game import Game
+    random.seed(seed)
+    game = Game()
+    game._new_game(None)
+    game.set_character_name('Benchmark')
+    game.start_game(Game.races[0])
+    game._autosaver.enabled = False
+    return game
+
+
+def play_headless_session(game, turns: int, seed: int = 0, explore: bool = False) -> None:
+    """
+    Wander around at random, working on the terrain every few turns. The character cannot die.
+    Explorers mostly keep their heading and change it every 100 turns, so they cross many locations.
+    """
+    rng = random.Random(seed)
+    heading = rng.choice('12346789')
+    for turn in range(turns):
+        game.character.hp = game.character.max_hp
+        if explore and turn % 100 == 0:
+            heading = rng.choice('12346789')
+        if rng.random() < 0.2:
+            game._player_work(rng.choice('12346789'))
+        elif explore and rng.random() < 0.8:
+            game._character_moves(heading)
+        else:
+            game._character_moves(rng.choice('12346789'))
+
+
+def _timed(function, repetitions: int) -> float:
+    """Return the mean time of a single call in seconds"""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        function()
+    return (time.perf_counter() - start) / repetitions
+
+
+def benchmark_screen_layout(frames: int = 300) -> dict[str, float]:
+    """Lay out a full game screen per frame: raw ANSI lines vs. already parsed StyledText lines"""
+    from windows import Window
+    import content_types as ct
+    game = new_headless_game()
+    window = Window(ui=HeadlessUI(game), title_source=game.get_current_location_name, border=True,
+                    content=ct.GameScene(game))
+    screen_lines = ct.GameScene(game).data().split('\n')
+    styled_lines = [utils.to_styled(line) for line in screen_lines]
+    results = {
+        'window_frame_ms': _timed(window.get_display_data, frames) * 1000,
+        'ansi_layout_ms': _timed(lambda: utils.left_justify_ansi_multiline(screen_lines, 80), frames) * 1000,
+        'styled_layout_ms': _timed(lambda: utils.left_justify_ansi_multiline(styled_lines, 80), frames) * 1000,
+    }
+    results['window_fps'] = 1000 / results['window_frame_ms']
+    return results
+
+
+def benchmark_static_window_redraw(frames: int = 300) -> dict[str, float]:
+    """Redraw an unchanged character sheet: memoized layout vs. laying it out again"""
+    from windows import Window
+    import content_types as ct
+    game = new_headless_game()
+    window = Window(ui=HeadlessUI(game), content=ct.CharacterSheet(game), border=True, title='Character sheet')
+    return {'memoized_frame_ms': _timed(window.get_display_data, frames) * 1000,
+            'full_layout_frame_ms': _timed(window._lay_out, frames) * 1000}
+
+
+def benchmark_command_dispatch(lookups: int = 1000) -> dict[str, float]:
+    """
+    Resolve a key in the inventory screen after a handled command, which touches the content
+    The command table is reused while the available commands stay the same, against rebuilding it on every key.
+    """
+    from windows import Window
+    import commands
+    import content_types as ct
+    game = new_headless_game()
+    game._open_inventory(None)
+    window = Window(ui=HeadlessUI(game), content=ct.InventoryScreen(game), border=True, title='Inventory')
+
+    def keypress():
+        window._content.touch()
+        return window._get_command_table().get('e')
+
+    def keypress_with_new_commands():
+        window._command_table = None
+        return keypress()
+
+    return {'cached_dispatch_us': _timed(keypress, lookups) * 1e6,
+            'changed_commands_dispatch_us': _timed(keypress_with_new_commands, lookups) * 1e6,
+            'rebuilt_dispatch_us': _timed(lambda: commands.CommandTable(window._content.commands()).get('e'),
+                                          lookups) * 1e6}
+
+
+def benchmark_save_game(turns: int = 2000) -> dict[str, float]:
+    """Save and load after a long session: seed+changes format vs. pickling the whole game"""
+    import saving
+    game = new_headless_game()
+    play_headless_session(game, turns)
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'benchmark.bal')
+        save_seconds = _timed(lambda: saving.save_game(game, file_name), 5)
+        load_seconds = _timed(lambda: saving.load_game(file_name), 5)
+        save_size = os.path.getsize(file_name)
+    full_game = {k: v for k, v in game.__dict__.items() if k not in game.transient_attributes or k == 'World'}
+    full_pickle_seconds = _timed(lambda: pickle.dumps(full_game, -1), 5)
+    return {'generated_locations': len(game.World.generated_locations()),
+            'save_kb': save_size / 1024,
+            'save_ms': save_seconds * 1000,
+            'load_ms': load_seconds * 1000,
+            'full_pickle_kb': len(pickle.dumps(full_game, -1)) / 1024,
+            'full_pickle_ms': full_pickle_seconds * 1000}
+
+
+def benchmark_saved_game_list(saves: int = 10, turns: int = 500) -> dict[str, float]:
+    """List the saved games: reading the headers only vs. loading every game"""
+    import saving
+    game = new_headless_game()
+    play_headless_session(game, turns)
+    with tempfile.TemporaryDirectory() as directory:
+        file_names = [os.path.join(directory, f'benchmark{n}.bal') for n in range(saves)]
+        for file_name in file_names:
+            saving.save_game(game, file_name)
+        header_seconds = _timed(lambda: [saving.read_header(file_name) for file_name in file_names], 5)
+        full_load_seconds = _timed(lambda: [saving.load_game(file_name) for file_name in file_names], 1)
+    return {'headers_ms': header_seconds * 1000,
+            'full_loads_ms': full_load_seconds * 1000}
+
+
+def benchmark_autosave(turns: int = 2000) -> dict[str, float]:
+    """Autosave during a long session: the turn only pays for the snapshot, the writer thread does the rest"""
+    import saving
+    game = new_headless_game()
+    with tempfile.TemporaryDirectory() as directory:
+        game._autosaver = saving.AutoSaver(directory=directory)
+        start = time.perf_counter()
+        play_headless_session(game, turns)
+        turn_seconds = (time.perf_counter() - start) / turns
+        saving.snapshot_writer.flush()
+        results = game._autosaver.metrics()
+    results['mean_turn_ms'] = turn_seconds * 1000
+    return results
+
+
+def benchmark_load_first_frame(short_session: int = 300, long_session: int = 6000) -> dict[str, float]:
+    """Time from loading a save to drawing the first frame, after a short and after a long exploration"""
+    import content_types as ct
+    import saving
+    results = {}
+    for session_name, turns in [('short', short_session), ('long', long_session)]:
+        game = new_headless_game()
+        play_headless_session(game, turns, explore=True)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'benchmark.bal')
+            saving.save_game(game, file_name)
+
+            def load_and_draw():
+                ct.GameScene(saving.load_game(file_name)).data()
+
+            def load_everything():
+                loaded_world = saving.load_game(file_name).World
+                for top_left in list(loaded_world.unloaded_changes):
+                    loaded_world.get_location(top_left)
+
+            results[f'{session_name}_saved_locations'] = len(game.World.generated_locations())
+            results[f'{session_name}_first_frame_ms'] = _timed(load_and_draw, 5) * 1000
+            results[f'{session_name}_load_all_locations_ms'] = _timed(load_everything, 5) * 1000
+    return results
+
+
+def benchmark_offscreen_simulation(turns: int = 3000) -> dict[str, float]:
+    """Explore with the nearby locations simulated off-screen: cost of a coarse tick and of a whole turn"""
+    import config
+    game = new_headless_game()
+    start = time.perf_counter()
+    play_headless_session(game, turns, explore=True)
+    turn_seconds = (time.perf_counter() - start) / turns
+    results = game._offscreen_simulation.metrics()
+    simulation = game._offscreen_simulation
+    tick_seconds = _timed(lambda: simulation.tick(game.World, game.active_area, config.offscreen_tick_period),
+                          100)
+    results['mean_tick_ms'] = tick_seconds * 1000
+    results['mean_turn_ms'] = turn_seconds * 1000
+    return results
+
+
+def benchmark_active_area(turns: int = 3000, npc_turns: int = 300) -> dict[str, float]:
+    """Creatures of the whole active area vs. of the current location only, after a long exploration"""
+    import config
+    results = {}
+    default_radius = config.active_area_radius
+    for area_name, radius in [('single_location', 0), ('active_area', default_radius)]:
+        config.active_area_radius = radius
+        try:
+            game = new_headless_game()
+            play_headless_session(game, turns, explore=True)
+            results[f'{area_name}_creatures'] = len(game._creature_coords)
+            results[f'{area_name}_npc_turn_ms'] = _timed(game._play_npcs, npc_turns) * 1000
+        finally:
+            config.active_area_radius = default_radius
+    return results
+
+
+def _crowd_active_area(game, creature_count: int) -> None:
+    """Fill the active area with random animals of the local species"""
+    import config
+    import game_objects as go
+    rng = random.Random(creature_count)
+    area = game.active_area
+    species_list = [species for location in area.locations.values()
+                    for terrain in location._terrains for species in terrain.spawned_creatures]
+    free_coords = [coords for top_left in area.locations
+                   for coords in [(top_left[0] + row, top_left[1] + column)
+                                  for row in range(config.location_height)
+                                  for column in range(config.location_width)]
+                   if coords not in game._creature_coords]
+    for coords in rng.sample(free_coords, creature_count):
+        game._creature_coords[coords] = go.Animal(rng.choice(species_list))
+
+
+def benchmark_npc_batch(creature_counts: tuple[int, ...] = (1000, 10000), turns: int = 3) -> dict[str, float]:
+    """NPC turns of a crowded active area: batched living and wandering vs. one creature object at a time"""
+    import config
+    results = {}
+    default_budget = config.active_area_npc_budget
+    for creature_count in creature_counts:
+        config.active_area_npc_budget = creature_count
+        try:
+            game = new_headless_game()
+            _crowd_active_area(game, creature_count)
+
+            def one_by_one():
+                for coords in game._acting_npc_coords():
+                    creature = game._creature_coords.get(coords)
+                    if creature is game.character or creature is None or creature.is_dead:
+                        continue
+                    creature.live()
+                    game._pursue_goals(creature, coords)
+
+            results[f'{creature_count}_batched_turn_ms'] = _timed(game._play_npcs, turns) * 1000
+            results[f'{creature_count}_one_by_one_turn_ms'] = _timed(one_by_one, 1) * 1000
+        finally:
+            config.active_area_npc_budget = default_budget
+    return results
+
+
+def benchmark_effect_ticks(creature_count: int = 10000, turns: int = 5) -> dict[str, float]:
+    """Effect ticks per second of a crowd with mixed effects: batched by effect kind vs. Creature.live()"""
+    import config
+    import game_objects as go
+    import npc_batch
+    import species
+    rng = random.Random(0)
+    extra_effects = [config.sick_effect, config.drunk_effect, config.non_rest_hp_regen_effect]
+    creatures = []
+    for _ in range(creature_count):
+        creature = go.Animal(rng.choice([species.wolf_species, species.fox_species, species.rat_species]))
+        for effect in rng.sample(extra_effects, rng.randint(0, 2)):
+            creature._active_effects[effect] = rng.randint(1, 20)
+        creatures.append(creature)
+    effect_ticks = sum(len(creature._active_effects) for creature in creatures)
+
+    def one_by_one():
+        for creature in creatures:
+            creature.live()
+
+    batched_seconds = _timed(lambda: npc_batch.NpcBatch(creatures).live(), turns)
+    one_by_one_seconds = _timed(one_by_one, turns)
+    return {'effect_ticks_per_turn': effect_ticks,
+            'batched_ticks_per_second': effect_ticks / batched_seconds,
+            'one_by_one_ticks_per_second': effect_ticks / one_by_one_seconds}
+
+
+def benchmark_campfires(fire_count: int = 500, turns: int = 200) -> dict[str, float]:
+    """Hundreds of long-lived campfires: scheduled by their next change vs. ticked every turn"""
+    import config
+    import effects
+    game = new_headless_game()
+    rng = random.Random(fire_count)
+    area = game.active_area
+    all_coords = [(top_left[0] + row, top_left[1] + column) for top_left in area.locations
+                  for row in range(config.location_height) for column in range(config.location_width)]
+    fire_coords = rng.sample(all_coords, fire_count)
+    for coords in fire_coords:
+        game._turn_effects.add(effects.Campfire(duration=rng.randint(turns, 3 * turns),
+                                                tile=area.tile_at(coords)), coords)
+    scheduler = game._turn_effects
+
+    def scheduled_turn():
+        game._turn += 1
+        scheduler.advance(game._turn)
+        scheduler.flicker(game._current_location.top_left)
+
+    scheduled_seconds = _timed(scheduled_turn, turns)
+    results = {'fires': fire_count, 'changes_per_turn': scheduler.changes / turns}
+    every_turn_fires = [effects.Campfire(duration=rng.randint(turns, 3 * turns), tile=area.tile_at(coords))
+                        for coords in fire_coords]
+
+    def every_turn():
+        for fire in every_turn_fires:
+            fire.tick()
+            fire.flicker()
+
+    results['scheduled_turn_ms'] = scheduled_seconds * 1000
+    results['every_turn_ms'] = _timed(every_turn, turns) * 1000
+    return results
+
+
+def benchmark_projectiles(volley_sizes: tuple[int, ...] = (100, 1000, 5000),
+                          creature_count: int = 500) -> dict[str, float]:
+    """Volleys flying across a crowded active area until every projectile lands"""
+    import config
+    import game_objects as go
+    import projectiles
+    from lines import direct_path
+    results = {}
+    game = new_headless_game()
+    _crowd_active_area(game, creature_count)
+    rng = random.Random(0)
+    area = game.active_area
+    all_coords = [(top_left[0] + row, top_left[1] + column) for top_left in area.locations
+                  for row in range(config.location_height) for column in range(config.location_width)]
+    for volley_size in volley_sizes:
+        engine = projectiles.ProjectileEngine()
+        for _ in range(volley_size):
+            start, target = rng.sample(all_coords, 2)
+            engine.launch(go.Item(name='an arrow', icon='/'), direct_path(start, target, supercover=True)[1:], {})
+        steps = 0
+        ticks = 0
+        start_time = time.perf_counter()
+        while len(engine):
+            steps += len(engine)
+            engine.tick(game._creature_coords)
+            ticks += 1
+        seconds = time.perf_counter() - start_time
+        results[f'{volley_size}_mean_tick_ms'] = seconds / ticks * 1000
+        results[f'{volley_size}_steps_per_second'] = steps / seconds
+    return results
+
+
+def _float_direct_path(a: tuple[int, int], b: tuple[int, int]) -> list[tuple[int, int]]:
+    """The float-based line that lines.direct_path replaced, kept as the baseline of the lines benchmark"""
+    path = [a[:]]
+    dif = [abs(a[0] - b[0]), abs(a[1] - b[1])]
+    direction_steps = [0, 0]
+    if abs(a[0] - b[0]):
+        direction_steps[0] = (b[0] - a[0]) // abs(a[0] - b[0])
+    if abs(a[1] - b[1]):
+        direction_steps[1] = (b[1] - a[1]) // abs(a[1] - b[1])
+    longer = dif.index(max(dif))
+    shorter = [1, 0][longer]
+    if dif[longer]:
+        floater = float(dif[shorter]) / dif[longer]
+    else:
+        return [a, b]
+    for x in range(dif[longer]):
+        point = list(a)
+        point[longer] += (x + 1) * direction_steps[longer]
+        point[shorter] += int(round((x + 1) * floater)) * direction_steps[shorter]
+        path.append(tuple(point))
+    return path
+
+
+def benchmark_lines(calls: int = 20000, max_offset: int = 30) -> dict[str, float]:
+    """Lines between random points a short distance apart, like targeting and hunting draw"""
+    import lines
+    rng = random.Random(0)
+    pairs = []
+    for _ in range(calls):
+        start = (rng.randint(0, 200), rng.randint(0, 200))
+        pairs.append((start, (start[0] + rng.randint(-max_offset, max_offset),
+                              start[1] + rng.randint(-max_offset, max_offset))))
+    lines.line_offsets.cache_clear()
+
+    def run(function):
+        start_time = time.perf_counter()
+        for start, end in pairs:
+            function(start, end)
+        return (time.perf_counter() - start_time) / calls * 1e6
+
+    results = {'float_line_us': run(_float_direct_path),
+               'cached_line_us': run(lines.direct_path),
+               'cached_supercover_us': run(lambda start, end: lines.direct_path(start, end, supercover=True)),
+               'first_step_us': run(lines.first_step)}
+    cache_info = lines.line_offsets.cache_info()
+    results['line_cache_hit_rate'] = cache_info.hits / (cache_info.hits + cache_info.misses)
+    return results
+
+
+def benchmark_spawn_placement(creature_count: int = 40, repetitions: int = 20,
+                              open_fractions: tuple[float, ...] = (1.0, 0.1, 0.01, 0.001, 0.0)) -> dict[str, float]:
+    """
+    Place a location's creatures and look for free spots on terrain mixes with fewer and fewer passable cells
+    The random retries and row scans that the planner and the free spot index replaced are measured too.
+    The retries are capped as they never end without a free cell.
+    """
+    import config
+    import game_objects as go
+    import species
+    import world
+    rng = random.Random(0)
+    location = world.World(seed='spawn benchmark').get_location((0, 0))
+    creatures = [go.Animal(species.rat_species) for _ in range(creature_count)]
+    retry_cap = 100_000
+    results = {}
+
+    def random_retries():
+        placed = {}
+        draws = 0
+        for creature in creatures:
+            while draws < retry_cap:
+                draws += 1
+                coords = (rng.randint(0, config.location_height - 1), rng.randint(0, config.location_width - 1))
+                if coords not in placed and creature.can_traverse(location.tile_at(coords)) == '':
+                    placed[coords] = creature
+                    break
+        return placed
+
+    def row_scan():
+        for coords in location._all_coords():
+            if creatures[0].can_traverse(location.tile_at(coords)) == '':
+                return coords
+
+    for open_fraction in open_fractions:
+        for row in location.contents:
+            for tile in row:
+                tile.terrain = world.grass if rng.random() < open_fraction else world.lava
+        location._passage_kinds = []
+        location._passage_grids = {}
+        location._passable_index = {}
+        placed = {}
+
+        def planner():
+            placed.clear()
+            location._place_creatures(creatures, placed)
+
+        results[f'{open_fraction}_planner_ms'] = _timed(planner, repetitions) * 1000
+        results[f'{open_fraction}_placed'] = len(placed)
+        results[f'{open_fraction}_random_retries_ms'] = _timed(random_retries, 1) * 1000
+        near_coords = [rng.choice(location._all_coords()) for _ in range(repetitions)]
+        results[f'{open_fraction}_nearest_spot_us'] = _timed(
+            lambda: [location.get_empty_spot_for(creatures[0], near=near) for near in near_coords], 1) \
+            / repetitions * 1e6
+        results[f'{open_fraction}_row_scan_us'] = _timed(row_scan, repetitions) * 1e6
+    return results
+
+
+def benchmark_world_creation(world_sizes: tuple[int, ...] = (9, 100, 1000),
+                             visited_locations: int = 500) -> dict[str, float]:
+    """
+    Create worlds of growing sizes, enter one location, draw the world map and walk through many locations
+    Generating every region is measured too, but only for small worlds.
+    """
+    import config
+    import world
+    results = {}
+    default_world_size = config.world_size
+    try:
+        for world_size in world_sizes:
+            config.world_size = world_size
+            start = time.perf_counter()
+            game_world = world.World(seed=world_size)
+            results[f'{world_size}_create_ms'] = (time.perf_counter() - start) * 1000
+            middle = (world_size // 2 * world.Region.height_in_tiles, world_size // 2 * world.Region.width_in_tiles)
+            results[f'{world_size}_first_location_ms'] = _timed(lambda: game_world.get_location(middle), 1) * 1000
+            results[f'{world_size}_world_map_ms'] = _timed(
+                lambda: game_world.data(blink_at=(world_size // 2, world_size // 2)), 1) * 1000
+            if world_size <= 100:
+                results[f'{world_size}_all_regions_ms'] = _timed(
+                    lambda: [game_world.get_region(row, column)
+                             for row in range(world_size) for column in range(world_size)], 1) * 1000
+            world_height, world_width = game_world.size
+            walk = [((step * config.location_height) % world_height, (step * 3 * config.location_width) % world_width)
+                    for step in range(visited_locations)]
+            results[f'{world_size}_location_lookup_us'] = _timed(
+                lambda: [game_world.get_location(coords) for coords in walk], 1) / visited_locations * 1e6
+            game_world.trim_locations(set())
+            results[f'{world_size}_kept_locations'] = len(game_world.generated_locations())
+    finally:
+        config.world_size = default_world_size
+    return results
+
+
+def benchmark_map_browsing(moves: int = 500) -> dict[str, float]:
+    """Move the selection around the world map, against rebuilding both maps on every move as it used to"""
+    import content_types as ct
+    game = new_headless_game()
+    screen = ct.MapScreen(game)
+    rng = random.Random(0)
+    directions = [rng.choice('12346789') for _ in range(moves)]
+    locations_before = len(game.World.generated_locations())
+    results = {'move_us': _timed(lambda: [screen._move_item_focus(direction) for direction in directions], 1)
+               / moves * 1e6,
+               'rebuild_us': _timed(screen._get_container_data, moves) * 1e6,
+               'frame_ms': _timed(screen.data, 50) * 1000,
+               'generated_locations': len(game.World.generated_locations()) - locations_before}
+    return results
+
+
+def benchmark_turn_profile(turns: int = 500) -> dict[str, float]:
+    """
+    Play the same session with the profiler off and on, and report the mean time of each part of a turn
+    The overhead of the disabled profiler is the difference to a session without any hooks, which is not measured.
+    """
+    from profiling import profiler
+    results = {}
+    game = new_headless_game()
+    results['disabled_turn_ms'] = _timed(lambda: play_headless_session(game, turns), 1) / turns * 1000
+    game = new_headless_game()
+    profiler.enable()
+    try:
+        results['enabled_turn_ms'] = _timed(lambda: play_headless_session(game, turns), 1) / turns * 1000
+        records = list(profiler.turns)[-turns:]
+        for path in sorted({path for record in records for path in record['timers']}):
+            if ';' not in path or path.startswith('turn;'):
+                results[f'{path}_ms'] = sum(record['timers'].get(path, {'ms': 0})['ms'] for record in records) / turns
+        results['folded_stacks'] = len(profiler.folded_stacks(records))
+    finally:
+        profiler.disable()
+    return results
+
+
+def _traced(function) -> tuple[object, float, int]:
+    """Call the function and return its result, the peak memory it allocated in KB and the blocks it left allocated"""
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+        blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024, blocks
+
+
+def _generation_pipeline(seed: int, measure) -> None:
+    """
+    Generate a world and the locations of up to 3x3 regions stage by stage
+    measure(stage, function, items) calls the function of each stage and returns its result.
+    """
+    import config
+    import world
+    random.seed(seed)
+    game_world = measure('world', lambda: world.World(seed=seed), 1)
+    side = min(config.world_size, 3)
+    regions = measure('regions', lambda: [game_world.get_region(row, column)
+                                          for row in range(side) for column in range(side)], side ** 2)
+    top_lefts = [region.get_location_top_left(row, column) for region in regions
+                 for row in range(config.region_size) for column in range(config.region_size)]
+    locations = measure('locations', lambda: [game_world.get_location(top_left) for top_left in top_lefts],
+                        len(top_lefts))
+    measure('terrain', lambda: [location.contents for location in locations], len(locations))
+    rng = random.Random(seed)
+    filler = world.filler_terrains[config.TEMPERATE_CLIMATE][config.ORDER_FORCE]
+    measure('structures', lambda: [world.well.new((config.location_height, config.location_width), filler, rng)
+                                   for _ in range(len(locations))], len(locations))
+    measure('creatures', lambda: [location.load_creatures({}, 0) for location in locations], len(locations))
+
+
+def benchmark_generation(seeds: tuple[int, ...] = (0, 1, 2),
+                         world_sizes: tuple[int, ...] = (9, 1000)) -> dict[str, float]:
+    """
+    The generation pipeline stage by stage, from the world to the creatures of its first locations
+    The results are per generated item. Times are averaged over the seeds. Memory is traced in a second run
+    of each seed, as tracing slows everything down: the highest peak in KB and the mean blocks left allocated.
+    """
+    import config
+    times = {}
+    peaks = {}
+    blocks = {}
+
+    def timed_stage(stage: str, function, items: int):
+        start = time.perf_counter()
+        result = function()
+        times.setdefault(stage, []).append((time.perf_counter() - start) / items)
+        return result
+
+    def traced_stage(stage: str, function, items: int):
+        result, peak, allocated_blocks = _traced(function)
+        peaks[stage] = max(peaks.get(stage, 0), peak / items)
+        blocks.setdefault(stage, []).append(allocated_blocks / items)
+        return result
+
+    results = {}
+    default_world_size = config.world_size
+    try:
+        for world_size in world_sizes:
+            config.world_size = world_size
+            times.clear()
+            peaks.clear()
+            blocks.clear()
+            for seed in seeds:
+                _generation_pipeline(seed, timed_stage)
+                _generation_pipeline(seed, traced_stage)
+            for stage in times:
+                results[f'{world_size}_{stage}_ms'] = sum(times[stage]) / len(times[stage]) * 1000
+                results[f'{world_size}_{stage}_peak_kb'] = peaks[stage]
+                results[f'{world_size}_{stage}_blocks'] = sum(blocks[stage]) / len(blocks[stage])
+    finally:
+        config.world_size = default_world_size
+    return results
+
+
+def benchmark_arena(fights: int = 2000,
+                    matchups: tuple[tuple[str, str], ...] = (('3xwolf', 'Human+LongSword+ChainMail'),
+                                                             ('Orc+BattleAxe+RoundShield', 'Elf+GreatSword'))
+                    ) -> dict[str, float]:
+    """
+    Fights between the sides of each matchup, in one process and in a worker process per CPU
+    The outcomes are the same either way, so they are reported once.
+    """
+    import arena
+    results = {}
+    for index, (attackers, defenders) in enumerate(matchups):
+        attackers, defenders = arena.Side.parse(attackers), arena.Side.parse(defenders)
+        single = arena.run_arena(attackers, defenders, fights, workers=1)
+        parallel = arena.run_arena(attackers, defenders, fights)
+        results[f'{index}_fights_per_second'] = single['fights_per_second']
+        results[f'{index}_parallel_fights_per_second'] = parallel['fights_per_second']
+        for outcome in ['attacker_win_rate', 'draw_rate', 'mean_rounds']:
+            results[f'{index}_{outcome}'] = single[outcome]
+    return results
+
+
+benchmarks = {'screen_layout': benchmark_screen_layout,
+              'static_window_redraw': benchmark_static_window_redraw,
+              'command_dispatch': benchmark_command_dispatch,
+              'save_game': benchmark_save_game,
+              'saved_game_list': benchmark_saved_game_list,
+              'autosave': benchmark_autosave,
+              'load_first_frame': benchmark_load_first_frame,
+              'offscreen_simulation': benchmark_offscreen_simulation,
+              'active_area': benchmark_active_area,
+              'npc_batch': benchmark_npc_batch,
+              'effect_ticks': benchmark_effect_ticks,
+              'campfires': benchmark_campfires,
+              'projectiles': benchmark_projectiles,
+              'lines': benchmark_lines,
+              'spawn_placement': benchmark_spawn_placement,
+              'world_creation': benchmark_world_creation,
+              'map_browsing': benchmark_map_browsing,
+              'turn_profile': benchmark_turn_profile,
+              'generation': benchmark_generation,
+              'arena': benchmark_arena}
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    report_file_name = None
+    if '--json' in arguments:
+        # A machine-readable report, e.g. to compare against the one of the last release
+        report_file_name = arguments.pop(arguments.index('--json') + 1)
+        arguments.remove('--json')
+    chosen = arguments or list(benchmarks)
+    report = {'python': platform.python_version(), 'started_at': time.time(), 'results': {}}
+    for name in chosen:
+        print(name)
+        report['results'][name] = benchmarks[name]()
+        for metric, value in report['results'][name].items():
+            print(f'  {metric}: {value:.3f}')
+    if report_file_name is not None:
+        with open(report_file_name, 'w') as report_file:
+            json.dump(report, report_file, indent=1)
@@ -1,4 +1,6 @@
 import string
+from typing import Callable, Optional
+
 import console
 
 
@@ -18,6 +20,10 @@ class Command:
     def commands():
         return {}
 
+    def characters(self) -> tuple[str, ...]:
+        """All input characters that trigger the command"""
+        return self.character,
+
 
 class CharacterRangeCommand(Command):
 
@@ -27,6 +33,27 @@ class CharacterRangeCommand(Command):
     def __hash__(self):
         return hash(self.character)
 
+    def characters(self) -> tuple[str, ...]:
+        return tuple(self.character)
+
+
+class CommandTable:
+    """
+    A command->callback mapping indexed by input character
+    Built once per command context so that dispatching a key is a single dict lookup
+    """
+
+    def __init__(self, command_callbacks: dict[Command, Callable]):
+        self.commands = command_callbacks
+        self._by_character: dict[str, tuple[Command, Callable]] = {}
+        for command, callback in command_callbacks.items():
+            for character in command.characters():
+                # Keep the first match, as a linear scan of the mapping would
+                self._by_character.setdefault(character, (command, callback))
+
+    def get(self, character: str) -> Optional[tuple[Command, Callable]]:
+        return self._by_character.get(character)
+
 
 class CharacterSheet(Command):
     character = '@'
@@ -5,6 +5,11 @@ location_height: int = 21
 location_width: int = 78
 region_size: int = 1  # Locations per row & column
 world_size: int = 9  # Regions per row & column
+region_block_size: int = 9  # Regions per row & column of a block, which balances its forces and suffixes
+loaded_location_limit: int = 64  # Locations kept in memory besides those around the character, ~1.3 MB each
+cached_region_limit: int = 2048  # Region summaries kept in memory
+world_map_height: int = 13  # Regions shown on the world map
+world_map_width: int = 35
 
 max_text_lines_on_page: int = 21
 max_text_line_length: int = 65
@@ -86,6 +91,9 @@ race_selection_title = (f' In a world of {order_color}Order{console.fx.end}, '
                         f'and {chaos_color}Chaos{console.fx.end}, who are you? ')
 saved_game_selection_title = "Which game would you like to continue?"
 saved_game_extension = 'bal'
+autosave_period = 50  # Turns between autosaves
+profiled_turns_kept = 1000  # Turn records that the profiler keeps in memory
+arena_max_rounds = 500  # Rounds after which an arena fight is a draw
 ground = 'Ground'
 equipment_title = 'Equipment'
 empty_string = '(empty)'
@@ -245,6 +253,17 @@ sling_type = 'sling_type'
 
 random_creatures_respawn_period = 500
 creature_rarity_scale = [1, 1 / 2, 1 / 9]
+# Locations around the current one where the creatures are simulated turn by turn
+active_area_radius = 1  # In locations
+active_area_npc_budget = 16  # Max creatures that act in one turn, those in the current location always act
+min_outside_npcs_per_turn = 4  # Creatures outside the current location that act even when it takes the whole budget
+# Off-screen simulation of the creatures stored in the locations around the active area
+offscreen_simulation_radius = 2  # In locations
+offscreen_tick_period = 10  # Turns between two coarse ticks
+offscreen_creature_budget = 200  # Max creatures advanced in one tick
+offscreen_wander_chance = 0.05  # Chance per tick that a creature moves to a neighboring location
+line_cache_size = 4096  # Relative offsets whose lines are kept
+neighbor_table_cache_size = 64  # Rectangles (locations and active areas) whose neighbor tables are kept
 
 # Day and night cycle
 daylight_phase = ' Day'
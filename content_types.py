@@ -1,15 +1,52 @@
 import glob
-import pickle
+from typing import Optional
 
 import commands
 import config
+import saving
 import console
 import utils
 
 
+def _command_key(command_callbacks: dict) -> tuple:
+    """A hashable key of the available commands, the same for any mapping with the same commands"""
+    return tuple((type(command), command.characters()) for command in command_callbacks)
+
+
 class WindowContent:
     def __init__(self, game_object):
         self.game_object = game_object
+        self._version = 0
+
+    @property
+    def version(self) -> Optional[int]:
+        """
+        A counter that changes whenever data() or commands() could change
+        None means that the content changes on its own and must be laid out on every frame
+        """
+        return self._version
+
+    @property
+    def in_flight(self) -> bool:
+        """Whether the content keeps changing on its own, so the window has to keep drawing it"""
+        return False
+
+    def touch(self) -> None:
+        """Mark the content as changed, e.g. after one of its commands was executed"""
+        self._version += 1
+
+    def command_context(self) -> tuple:
+        """
+        A hashable key that changes whenever commands() could return a different mapping
+        The key lists the own commands of the content. The underlying object describes its commands
+        with its own command_context(), or they are listed too if it has none.
+        """
+        get_object_context = getattr(self.game_object, 'command_context', None)
+        if get_object_context is not None:
+            object_context = get_object_context()
+        else:
+            object_context = _command_key(self._object_commands())
+        return _command_key(self._own_commands), object_context
 
     @property
     def _own_commands(self):
@@ -28,12 +65,12 @@ class WindowContent:
 
     def _object_commands(self) -> dict:
         """The mapping of commands&methods specific for the underlying object(s)"""
-        try:
-            object_commands = self.game_object.commands()
-        except AttributeError:
-            object_commands = {}
-            for obj in self.game_object:
-                object_commands.update(obj.commands())
+        get_object_commands = getattr(self.game_object, 'commands', None)
+        if get_object_commands is not None:
+            return get_object_commands()
+        object_commands = {}
+        for obj in self.game_object:
+            object_commands.update(obj.commands())
         return object_commands
 
 
@@ -133,7 +170,23 @@ class CharacterSheet(WindowContent):
 
 
 class GameScene(WindowContent):
+    @property
+    def version(self) -> Optional[int]:
+        # Projectiles move on every sub-turn tick, so the scene is never static
+        return None
+
+    @property
+    def in_flight(self) -> bool:
+        # Projectiles can fly outside the visible location, where they do not change the drawn frame,
+        # and the message line changes when a save finishes writing
+        return self.game_object.projectiles_in_flight or self.game_object.save_in_progress
+
+    def command_context(self) -> tuple:
+        # The scene has no commands of its own, only the game state decides what is available
+        return self.game_object.command_context()
+
     def data(self) -> str:
+        self.game_object.report_saves()
         character_hud = self.game_object.get_character_hud()
         area_view = self.game_object.get_area_view()
         self.game_object.sub_turn_tick()
@@ -210,14 +263,24 @@ class MultiContainerScreen(WindowContent):
         combined_content = [''.join(rows) for rows in zip(*[c for c in equalized_content])]
         return '\n'.join(combined_content)
 
+    def _view_top_left(self, container_index: int) -> tuple[int, int]:
+        """Where the shown part of a container starts, for containers too large to be shown whole"""
+        return 0, 0
+
     def cursor_pos(self) -> tuple[int, int]:
         left_pad = self._extra_pads[self._active_container_index]
         left_pad += self._max_view_width * self._active_container_index
-        return (self._selected_pos[self._active_container_index][0] + 1,
-                self._selected_pos[self._active_container_index][1] + left_pad)
+        top, left = self._view_top_left(self._active_container_index)
+        return (self._selected_pos[self._active_container_index][0] - top + 1,
+                self._selected_pos[self._active_container_index][1] - left + left_pad)
 
 
 class MapScreen(MultiContainerScreen):
+    """
+    The world map around the selected region and the map of that region, both drawn from map summaries
+    Moving the selection only redraws the cells that stop and start blinking, unless the view has to move.
+    """
+
     def _set_names(self) -> None:
         self._names = ['World', 'Region']
 
@@ -226,10 +289,52 @@ class MapScreen(MultiContainerScreen):
                 self.game_object.get_character_position_in_region()]
 
     def _get_container_data(self) -> None:
-        self._data = [self.game_object.get_world_data(blink_at=self._selected_pos[0]),
-                      self.game_object.get_region_data(self._selected_pos[0], blink_at=self._selected_pos[1])]
+        self._world_view_top_left = self.game_object.get_world_view_top_left(self._selected_pos[0])
+        self._map_rows = [self.game_object.get_world_map(self._world_view_top_left),
+                          self.game_object.get_region_map(self._selected_pos[0])]
+        # The icons without the blinking cell, to restore a cell when the selection leaves it
+        self._plain_rows = [[row[:] for row in rows] for rows in self._map_rows]
+        self._data = [None, None]
         self._container_sizes = [(config.world_size, config.world_size),
                                  (config.region_size, config.region_size)]
+        for container_index in range(len(self._names)):
+            self._set_blinking(container_index, True)
+
+    def _view_top_left(self, container_index: int) -> tuple[int, int]:
+        if container_index == 0:
+            return self._world_view_top_left
+        return 0, 0
+
+    def _set_blinking(self, container_index: int, blinking: bool) -> None:
+        top, left = self._view_top_left(container_index)
+        row, column = self._selected_pos[container_index][0] - top, self._selected_pos[container_index][1] - left
+        plain_icon = self._plain_rows[container_index][row][column]
+        if not blinking or plain_icon == '@':
+            icon = plain_icon
+        elif container_index == 0:
+            icon = self.game_object.get_blinking_region_icon(self._selected_pos[0])
+        else:
+            icon = self.game_object.get_blinking_location_icon(self._selected_pos[0], self._selected_pos[1])
+        self._map_rows[container_index][row][column] = icon
+        self._data[container_index] = '\n'.join(''.join(map_row) for map_row in self._map_rows[container_index])
+
+    def _move_item_focus(self, direction) -> bool:
+        container_index = self._active_container_index
+        new_selection = utils.calculate_new_position(self._selected_pos[container_index], direction,
+                                                     *self._container_sizes[container_index])
+        if container_index == 0 \
+                and self.game_object.get_world_view_top_left(new_selection) != self._world_view_top_left:
+            self._selected_pos[container_index] = new_selection
+            self._get_container_data()
+            return True
+        self._set_blinking(container_index, False)
+        self._selected_pos[container_index] = new_selection
+        if container_index == 0:
+            self._map_rows[1] = self.game_object.get_region_map(new_selection)
+            self._plain_rows[1] = [row[:] for row in self._map_rows[1]]
+            self._set_blinking(1, True)
+        self._set_blinking(container_index, True)
+        return True
 
     def _get_details(self) -> tuple[list[str], list[str]]:
         region_details = self.game_object.get_region_map_details(self._selected_pos[0])
@@ -313,6 +418,9 @@ class PagedList(WindowContent):
     def _get_items(self) -> list:
         raise NotImplementedError(f'Class {self.__class__} must implement _get_items()!')
 
+    def command_context(self) -> tuple:
+        return _command_key(self.commands())
+
     def commands(self) -> dict:
         if len(self._pages) > 1:
             return {commands.NextPage(): self._next_page,
@@ -384,9 +492,12 @@ class SavedGamesList(PagedList):
         game_file_names = glob.glob(f"*.{config.saved_game_extension}")
         saved_games = []
         for file_name in game_file_names:
-            with open(file_name, "rb") as save_file:
-                saved_games.append(pickle.load(save_file))
-        return saved_games
+            try:
+                saved_games.append(saving.read_header(file_name))
+            except ValueError:
+                # Unreadable or older saves are left out of the list
+                pass
+        return sorted(saved_games, key=lambda x: x.saved_at, reverse=True)
 
 
 class SentientSpeciesList(PagedList):
@@ -417,9 +528,19 @@ class DescriptionList(WindowContent):
 
 
 class TextInputField:
+    in_flight = False
+
     def __init__(self, max_length: int):
         self._data = ''
         self._max_length = max_length
+        self.version = 0
+
+    def touch(self) -> None:
+        self.version += 1
+
+    @staticmethod
+    def command_context() -> None:
+        return None
 
     def commands(self) -> dict:
         return {commands.TextInput(): self._add_character,
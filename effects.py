@@ -1,3 +1,6 @@
+import heapq
+from typing import Optional, Type
+
 import game_objects as go
 import items
 import console
@@ -24,3 +27,102 @@ class Campfire(go.Effect):
 
     def _effects_on_duration_change(self) -> None:
         self._tick_specific_effects()
+
+    def turns_to_next_change(self) -> int:
+        """The fire only looks different once its strength changes, so the amount is updated at those turns"""
+        for threshold in [go.PowerSource.strong_amount, go.PowerSource.medium_amount]:
+            if self.duration >= threshold:
+                return self.duration - threshold + 1
+        return self.duration
+
+
+class EffectScheduler:
+    """
+    The effects on the ground, woken up only at the turns when their state changes
+    Every effect has one live entry in a heap ordered by the turn of its next change. Entries that were
+    superseded when an effect was rescheduled stay in the heap and are skipped when they come up.
+    """
+    def __init__(self):
+        self._effects: dict[tuple[int, int], list[go.Effect]] = {}
+        self._positions_by_location: dict[tuple[int, int], set[tuple[int, int]]] = {}
+        self._heap: list[tuple[int, int, tuple[int, int], go.Effect]] = []
+        self._sequence = 0
+        self._turn = 0
+        self.changes = 0
+
+    def __len__(self) -> int:
+        return sum(len(effect_list) for effect_list in self._effects.values())
+
+    @staticmethod
+    def _location_top_left(position: tuple[int, int]) -> tuple[int, int]:
+        return (position[0] - position[0] % config.location_height,
+                position[1] - position[1] % config.location_width)
+
+    def effects_at(self, position: tuple[int, int]) -> list[go.Effect]:
+        effect_list = self._effects.get(position, [])
+        for effect in effect_list:
+            self._catch_up(effect)
+        return effect_list
+
+    def find(self, position: tuple[int, int], effect_type: Type[go.Effect]) -> Optional[go.Effect]:
+        for effect in self.effects_at(position):
+            if isinstance(effect, effect_type):
+                return effect
+        return None
+
+    def add(self, effect: go.Effect, position: tuple[int, int]) -> None:
+        self._effects.setdefault(position, []).append(effect)
+        self._positions_by_location.setdefault(self._location_top_left(position), set()).add(position)
+        effect.updated_turn = self._turn
+        self._schedule(effect, position)
+
+    def extend(self, effect: go.Effect, position: tuple[int, int], turns: int) -> None:
+        self._catch_up(effect)
+        effect.duration += turns
+        self._schedule(effect, position)
+
+    def advance(self, turn: int) -> None:
+        """Apply every change that is due by the turn"""
+        self._turn = turn
+        while self._heap and self._heap[0][0] <= turn:
+            change_turn, _, position, effect = heapq.heappop(self._heap)
+            if effect.next_change_turn != change_turn:
+                continue
+            self._catch_up(effect)
+            self.changes += 1
+            if effect.duration <= 0:
+                self._remove(effect, position)
+            else:
+                self._schedule(effect, position)
+
+    def locations(self) -> set[tuple[int, int]]:
+        """The top lefts of the locations with effects on the ground"""
+        return set(self._positions_by_location)
+
+    def flicker(self, top_left: tuple[int, int]) -> None:
+        """The cosmetic ticks of the effects in one location, the one being looked at"""
+        for position in self._positions_by_location.get(top_left, ()):
+            for effect in self._effects[position]:
+                effect.flicker()
+
+    def _catch_up(self, effect: go.Effect) -> None:
+        elapsed = self._turn - effect.updated_turn
+        if elapsed > 0:
+            effect.tick(turns=elapsed)
+            effect.updated_turn = self._turn
+
+    def _schedule(self, effect: go.Effect, position: tuple[int, int]) -> None:
+        change_turn = self._turn + effect.turns_to_next_change()
+        effect.next_change_turn = change_turn
+        heapq.heappush(self._heap, (change_turn, self._sequence, position, effect))
+        self._sequence += 1
+
+    def _remove(self, effect: go.Effect, position: tuple[int, int]) -> None:
+        self._effects[position].remove(effect)
+        effect.next_change_turn = None
+        if not self._effects[position]:
+            del self._effects[position]
+            top_left = self._location_top_left(position)
+            self._positions_by_location[top_left].discard(position)
+            if not self._positions_by_location[top_left]:
+                del self._positions_by_location[top_left]
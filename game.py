@@ -1,15 +1,21 @@
-import pickle
+import collections
 from typing import Optional, Union
 import console
 import random
 
-from utils import coord_distance, calculate_new_position, dim, direct_path, raw_length
+from utils import coord_distance, calculate_new_position, dim, raw_length
 import game_objects as go
-from world import Location, World
+from world import ActiveArea, Location, World
 import commands
 import config
+import lines
+import saving
+import projectiles
+import simulation
 import items
 import effects
+import npc_batch
+from profiling import profiler
 
 
 class Game:
@@ -36,12 +42,15 @@ class Game:
     ended_state = 'ended'
     scene_substates = [moving_substate, sneaking_substate, working_substate, looking_substate]
     races = go.sentient_races
+    # Rebuilt at runtime instead of being saved
+    transient_attributes = ('World', '_autosaver', '_offscreen_simulation', '_active_area', '_outside_npc_queue')
 
     def __init__(self):
         self._turn = 0
         self._empty_space = go.Item.empty_space
         self.character: Optional[go.Humanoid] = None
         self._current_location: Optional[Location] = None
+        self._active_area: Optional[ActiveArea] = None
         self.character_name: Optional[str] = None
         self._last_character_target = None
         self._equipping_slot: Optional[str] = None
@@ -58,15 +67,30 @@ class Game:
         self._new_message: str = ''
         self._current_message: str = ''
         self._observed_target: Optional[tuple[int, int]] = None
-        self._turn_effects: dict[tuple[int, int], list[go.Effect]] = {}
-        self._sub_turn_effects: dict = {}
+        self._turn_effects = effects.EffectScheduler()
+        self._projectiles = projectiles.ProjectileEngine()
         self._chosen_transformation: Optional[dict[str, int]] = None
         self._last_scene_state = Game.moving_substate
+        self._autosaver = saving.AutoSaver()
+        self._offscreen_simulation = simulation.OffscreenSimulation()
+        # The creatures outside the current location by identity, in the order in which they take turns acting
+        self._outside_npc_queue: collections.deque[int] = collections.deque()
 
     @property
     def name(self) -> str:
         return self.character_name
 
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    @property
+    def active_area(self) -> ActiveArea:
+        """The locations around the current one, rebuilt after loading or changing the current location"""
+        if self._active_area is None or self._active_area.center is not self._current_location:
+            self._active_area = ActiveArea(self.World, self._current_location)
+        return self._active_area
+
     @property
     def color(self) -> str:
         return self.character.species.color
@@ -94,28 +118,28 @@ Game Over!
                                      icon='@')
         # TODO: This is the initial testing configuration. Add the selected starting location here.
         initial_coords = (0, 0)
-        self._current_location = self.World.get_location(initial_coords)
-        character_coords = self._current_location.get_empty_spot_for(self.character)
+        character_coords = None
+        # Start in the initial location or, if it has no room for the character, in one of those around it
+        for top_left in [initial_coords] + self._offscreen_simulation.nearby(initial_coords, self.World,
+                                                                             config.offscreen_simulation_radius):
+            self._current_location = self.World.get_location(top_left)
+            character_coords = self._current_location.get_empty_spot_for(self.character,
+                                                                         occupied=self._creature_coords)
+            if character_coords is not None:
+                break
+        if character_coords is None:
+            raise ValueError(f'There is no room for the character around {initial_coords}!')
         self._creature_coords[character_coords] = self.character
-        self._creature_coords = self._current_location.load_creatures(self._creature_coords, self._turn)
-
-        self._current_location.put_item(items.Bag(), character_coords)
-        self._current_location.put_item(items.LongSword(), character_coords)
-        self._current_location.put_item(items.GreatSword(), character_coords)
-        self._current_location.put_item(items.RoundShield(), character_coords)
-        self._current_location.put_item(items.LeatherArmor(), character_coords)
-        self._current_location.put_item(items.SnowShoes(), character_coords)
+        for location in self.active_area.locations.values():
+            self._creature_coords = location.load_creatures(self._creature_coords, self._turn)
+
         water_skin = items.WaterSkin()
         water_skin.fill(items.water_liquid, 2)
-        self._current_location.put_item(water_skin, character_coords)
-        self._current_location.put_item(items.Firewood(), character_coords)
-        self._current_location.put_item(items.Firewood(), character_coords)
-        self._current_location.put_item(items.Firewood(), character_coords)
-        self._current_location.put_item(items.AcornGun(), character_coords)
-        for i in range(10):
-            self._current_location.put_item(items.Acorn(), character_coords)
-        self._current_location.put_item(items.FlintAndSteel(), character_coords)
-        self._current_location.put_item(items.PlateArmor(), character_coords)
+        self._put_on_ground([items.Bag(), items.LongSword(), items.GreatSword(), items.RoundShield(),
+                             items.LeatherArmor(), items.SnowShoes(), water_skin,
+                             items.Firewood(), items.Firewood(), items.Firewood(), items.AcornGun()]
+                            + [items.Acorn() for _ in range(10)]
+                            + [items.FlintAndSteel(), items.PlateArmor()], character_coords)
 
         self.state = Game.playing_state
         self.substate = Game.moving_substate
@@ -125,6 +149,13 @@ Game Over!
         self.substate = Game.race_selection_substate
         return True
 
+    def command_context(self) -> tuple:
+        """A hashable key that changes whenever commands() could return a different mapping"""
+        if self.state != Game.playing_state:
+            return self.state, self.substate
+        return (self.state, self.substate, self.character.is_dead, self.active_inventory_container_name,
+                id(self._selected_ground_item), id(self._selected_bag_item), self.selected_equipped_item_index)
+
     def commands(self) -> dict:
         if self.state == Game.welcome_state:
             return {commands.NewGame(): self._new_game,
@@ -251,16 +282,12 @@ Game Over!
 
     def _apply_effect(self, effect: str, effect_size: int, coords: tuple[int, int]) -> None:
         if effect == config.light_a_fire:
-            if coords in self._turn_effects:
-                for effect in self._turn_effects[coords]:
-                    if isinstance(effect, effects.Campfire):
-                        effect.duration += effect_size
-                        return
-                self._turn_effects[coords].append(effects.Campfire(duration=effect_size,
-                                                                   tile=self._current_location.tile_at(coords)))
+            campfire = self._turn_effects.find(coords, effects.Campfire)
+            if campfire is not None:
+                self._turn_effects.extend(campfire, coords, effect_size)
             else:
-                self._turn_effects[coords] = [effects.Campfire(duration=effect_size,
-                                                               tile=self._current_location.tile_at(coords))]
+                self._turn_effects.add(effects.Campfire(duration=effect_size,
+                                                        tile=self._current_location.tile_at(coords)), coords)
 
     def _get_accessible_tools(self) -> list[str]:
         available_tools = []
@@ -298,6 +325,7 @@ Game Over!
                 if isinstance(target, go.Creature):
                     target = self._get_coords_of_creature(target)
                 character_position = self._get_coords_of_creature(self.character)
+                target = self.active_area.nearest_coords(character_position, target)
                 distance = coord_distance(character_position, target)
                 max_distance = self.character.get_shooting_range()
                 if distance > max_distance:
@@ -312,14 +340,12 @@ Game Over!
                     x_deviation = random.randint(0, max_deviation) * random.choice([-1, 1])
                     y_deviation = random.randint(0, max_deviation) * random.choice([-1, 1])
                     final_target = (target[0] + y_deviation, target[1] + x_deviation)
-                    while not self._current_location.contains_coords(final_target):
+                    while not self.active_area.contains_coords(final_target):
                         x_deviation = random.randint(0, max_deviation) * random.choice([-1, 1])
                         y_deviation = random.randint(0, max_deviation) * random.choice([-1, 1])
                         final_target = (target[0] + y_deviation, target[1] + x_deviation)
-                    projectile_path = direct_path(character_position, final_target)[1:]
-                    flying_projectile = {'item': projectile, 'path': projectile_path,
-                                         'effects': effect_dict}
-                    self._sub_turn_effects[projectile_path[0]] = flying_projectile
+                    path = lines.direct_path(character_position, final_target, supercover=True)[1:]
+                    self._projectiles.launch(projectile, list(map(self.active_area.wrap_coords, path)), effect_dict)
         self._living_world()
         return True
 
@@ -394,7 +420,7 @@ Game Over!
             self.character.bag.add_item(item)
         else:
             if isinstance(self._ground_container, go.Tile):
-                self._current_location.put_item(item, self._get_coords_of_creature(self.character))
+                self._put_on_ground([item], self._get_coords_of_creature(self.character))
             else:
                 self._ground_container.add_item(item)
         return True
@@ -426,8 +452,7 @@ Game Over!
     def _drop_from_inventory_screen(self, _) -> bool:
         self.character.bag.remove_item(self._selected_bag_item)
         if isinstance(self._ground_container, go.Tile):
-            self._current_location.put_item(self._selected_bag_item,
-                                            self._get_coords_of_creature(self.character))
+            self._put_on_ground([self._selected_bag_item], self._get_coords_of_creature(self.character))
         else:
             self._ground_container.add_item(self._selected_bag_item)
         return True
@@ -439,8 +464,7 @@ Game Over!
             if unequipped_item is not self._empty_space and self.character.bag.has_space():
                 self.character.bag.add_item(unequipped_item)
             elif unequipped_item is not self._empty_space:
-                self._current_location.put_item(unequipped_item,
-                                                self._get_coords_of_creature(self.character))
+                self._put_on_ground([unequipped_item], self._get_coords_of_creature(self.character))
         return True
 
     def _equip_from_ground_in_inventory_screen(self, _) -> bool:
@@ -520,9 +544,8 @@ Game Over!
         return True
 
     def _save_game(self, _) -> bool:
-        with open(f"./{self.character.name}.{config.saved_game_extension}", "wb") as outfile:
-            pickle.dump(self, outfile, -1)
-        self._current_message = "Game saved!"
+        self._autosaver.save(self, report=True)
+        self._current_message = "Saving..."
         return True
 
     def _initiate_load(self, _) -> bool:
@@ -530,11 +553,11 @@ Game Over!
         self.substate = Game.saved_game_selection_substate
         return True
 
-    def load_game(self, saved_game: 'Game'):
+    def load_game(self, saved_game: Optional[saving.SavedGameHeader]):
         if saved_game is None:
             self.state = Game.welcome_state
         else:
-            self.__dict__.update(saved_game.__dict__)
+            self.__dict__.update(saving.load_game(saved_game.file_name).__dict__)
             go.Item.empty_space = self._empty_space
 
     @staticmethod
@@ -549,55 +572,68 @@ Game Over!
                   Ivan Popov'''
 
     def _living_world(self) -> None:
-        self._current_message = self._new_message
-        self._new_message = ''
-        self._turn += 1
-        self._play_npcs()
-        self.character.live()
-        for (position, effect_list) in list(self._turn_effects.items()):
-            for effect in effect_list[:]:
-                effect.tick()
-                if effect.duration <= 0:
-                    self._turn_effects[position].remove(effect)
-                    if not self._turn_effects[position]:
-                        self._turn_effects.pop(position)
+        with profiler.timer('turn'):
+            self._current_message = self._new_message
+            self._new_message = ''
+            self._turn += 1
+            self._play_npcs()
+            with profiler.timer('offscreen'):
+                self._offscreen_simulation.tick(self.World, self.active_area, self._turn)
+            with profiler.timer('character'):
+                self.character.live()
+            with profiler.timer('effects'):
+                self._turn_effects.advance(self._turn)
+                self._turn_effects.flicker(self._current_location.top_left)
+            if not self.character.is_dead:
+                with profiler.timer('autosave'):
+                    autosave_error = self._autosaver.after_turn(self, self._current_location.top_left)
+                if autosave_error:
+                    self._add_message(autosave_error)
+        profiler.end_turn(self._turn)
+
+    @property
+    def projectiles_in_flight(self) -> bool:
+        return self._projectiles.in_flight
+
+    @property
+    def save_in_progress(self) -> bool:
+        return self._autosaver.saving
+
+    def report_saves(self) -> None:
+        """Replace the saving message once the writer thread has finished"""
+        save_message = self._autosaver.poll()
+        if save_message:
+            self._current_message = save_message
 
+    @profiler.timed('projectiles')
     def sub_turn_tick(self) -> None:
-        for position in list(self._sub_turn_effects):
-            if position not in self._sub_turn_effects:
-                continue
-            effect = self._sub_turn_effects.pop(position)
-            if position == effect['path'][-1] or position in self._creature_coords:
-                next_position = position
-            else:
-                current_pos_index = effect['path'].index(position)
-                next_position = effect['path'][current_pos_index + 1]
-            if next_position in self._creature_coords:
-                creature = self._creature_coords[next_position]
-                creature.apply_effects(effect['effects'])
-                self._end_effect(effect, next_position)
-                if creature.is_dead:
-                    self._creature_died(creature)
-            elif next_position in self._sub_turn_effects:
-                other_effect = self._sub_turn_effects.pop(next_position)
-                for eff in [effect, other_effect]:
-                    self._end_effect(eff, next_position)
-            elif next_position == effect['path'][-1]:
-                self._end_effect(effect, next_position)
-            else:
-                self._sub_turn_effects[next_position] = effect
+        for landing in self._projectiles.tick(self._creature_coords):
+            profiler.count('projectile_landings')
+            # Several projectiles of a volley can land on a creature that the first one already killed
+            creature = landing.creature if landing.creature is not None and not landing.creature.is_dead else None
+            if creature is not None:
+                creature.apply_effects(landing.projectile.effects)
+            self._end_effect(landing.projectile, landing.position)
+            if creature is not None and creature.is_dead:
+                self._creature_died(creature)
 
-    def _end_effect(self, effect: dict, position: tuple[int, int]) -> None:
-        if 'item' in effect:
-            self._current_location.put_item(effect['item'], position)
+    def _end_effect(self, projectile: projectiles.Projectile, position: tuple[int, int]) -> None:
+        self._put_on_ground([projectile.item], position)
+
+    def _put_on_ground(self, dropped_items: list[go.Item], coords: tuple[int, int]) -> None:
+        if lost_items := self.active_area.put_items(dropped_items, coords):
+            self._add_message(f'There is no room left on the ground, {len(lost_items)} item(s) lost!')
 
     def _creature_died(self, creature: go.Creature) -> None:
         if creature is self.character:
             return
         coords = self._get_coords_of_creature(creature)
-        for item in creature.get_drops():
-            self._current_location.put_item(item, coords)
+        self._put_on_ground(creature.get_drops(), coords)
         self._creature_coords.pop(coords)
+        self._forget_creature(creature)
+
+    def _forget_creature(self, creature: go.Creature) -> None:
+        """Drop the references to a creature that left the active area"""
         for other_creature in self._creature_coords.values():
             if creature is other_creature.ranged_target:
                 other_creature.ranged_target = None
@@ -615,14 +651,13 @@ Game Over!
             self._move_character(direction)
             return
         try:
-            tile = self._current_location.tile_at(work_coords)
+            tile = self.active_area.tile_at(work_coords)
         except ValueError:
             self._add_message('You cannot work on that!')
             return
         drops, message = self.character.work_on(tile)
         if message:
-            for drop in drops:
-                self._current_location.put_item(drop, work_coords)
+            self._put_on_ground(drops, work_coords)
             self._add_message(message)
             self._last_character_target = None
         else:
@@ -633,33 +668,92 @@ Game Over!
                               if cr.is_detected and cr is not creature}
         return filtered_creatures
 
+    def _acting_npc_coords(self) -> list[tuple[int, int]]:
+        """
+        The creatures of the current location act every turn. Those elsewhere in the active area take turns
+        acting in the rest of config.active_area_npc_budget, but never fewer than config.min_outside_npcs_per_turn.
+        Their queue keeps its order when they move, so each of them acts at least once per queue length / share turns.
+        """
+        local_coords = []
+        outside_coords = {}
+        for coords, creature in self._creature_coords.items():
+            if self._current_location.contains_coords(coords):
+                local_coords.append(coords)
+            else:
+                outside_coords[id(creature)] = coords
+        share = max(config.min_outside_npcs_per_turn, config.active_area_npc_budget - len(local_coords))
+        if len(outside_coords) <= share:
+            return local_coords + list(outside_coords.values())
+        queue = collections.deque(creature_id for creature_id in self._outside_npc_queue
+                                  if creature_id in outside_coords)
+        queued = set(queue)
+        queue.extend(creature_id for creature_id in outside_coords if creature_id not in queued)
+        acting = [queue.popleft() for _ in range(share)]
+        queue.extend(acting)
+        self._outside_npc_queue = queue
+        return local_coords + [outside_coords[creature_id] for creature_id in acting]
+
+    @profiler.timed('npcs')
     def _play_npcs(self) -> None:
-        for old_coords in list(self._creature_coords.keys()):
-            creature = self._creature_coords.get(old_coords)
-            if creature is self.character or creature is None:
+        acting_coords = self._acting_npc_coords()
+        profiler.count('acting_npcs', len(acting_coords))
+        living_coords = {}
+        for coords in acting_coords:
+            creature = self._creature_coords[coords]
+            if creature is self.character:
                 continue
             if creature.is_dead:
                 # This check is needed if an effect killed the creature already in _living_world()
                 self._creature_died(creature)
+            else:
+                living_coords[coords] = creature
+        batch = npc_batch.NpcBatch(list(living_coords.values()), list(living_coords))
+        batch.live()
+        humanoid_coords = batch.humanoid_coords(self._creature_coords)
+        for index, creature in enumerate(batch.creatures):
+            old_coords = batch.coords[index]
+            if self._creature_coords.get(old_coords) is not creature:
+                # Killed earlier in the turn
                 continue
-            creature.live()
-            goals = creature.get_goals()
-            for goal in goals:
-                if goal.startswith(config.movement_behavior):
+            quick_goal = batch.quick_goal(index, self.active_area, humanoid_coords)
+            if quick_goal is None:
+                new_coords, bumped_creature = self._pursue_goals(creature, old_coords)
+                if isinstance(creature.species, go.HumanoidSpecies):
+                    humanoid_coords = batch.humanoid_coords(self._creature_coords)
+            elif quick_goal[0] == config.resting_behavior:
+                creature.rest()
+                new_coords, bumped_creature = old_coords, None
+            else:
+                new_coords, bumped_creature = self._move_npc(creature, old_coords, quick_goal[1])
+            # The object code changed the creature and whoever it bumped into, which may still act this turn
+            batch.refresh(creature, new_coords)
+            if bumped_creature is not None:
+                batch.refresh(bumped_creature)
+
+    def _pursue_goals(self, creature: go.Creature,
+                      old_coords: tuple[int, int]) -> tuple[tuple[int, int], Optional[go.Creature]]:
+        """The coordinates of the creature after pursuing its goals and the creature that it bumped into, if any"""
+        goals = creature.get_goals()
+        other_creatures = None
+        for goal in goals:
+            if goal.startswith(config.movement_behavior):
+                # Nothing moves between the goals of one creature, so they share the filtered creatures
+                if other_creatures is None:
                     other_creatures = self._filter_detected_creatures(creature)
-                    next_coords = self._current_location.get_goal_step(creature, old_coords,
-                                                                       goal, other_creatures)
-                    if next_coords == old_coords and goal != goals[-1]:
-                        continue
-                    self._move_npc(creature, old_coords, next_coords)
-                    break
-                elif goal == config.resting_behavior:
-                    creature.rest()
-                    break
-                else:
-                    raise ValueError(f'Unhandled behaviour: "{goal}" of creature "{creature.name}"!')
+                next_coords = self.active_area.get_goal_step(creature, old_coords, goal, other_creatures)
+                if next_coords == old_coords and goal != goals[-1]:
+                    continue
+                return self._move_npc(creature, old_coords, next_coords)
+            elif goal == config.resting_behavior:
+                creature.rest()
+                break
+            else:
+                raise ValueError(f'Unhandled behaviour: "{goal}" of creature "{creature.name}"!')
+        return old_coords, None
 
-    def _move_npc(self, creature: go.Creature, old_coords: tuple[int, int], next_coords: tuple[int, int]) -> None:
+    def _move_npc(self, creature: go.Creature, old_coords: tuple[int, int],
+                  next_coords: tuple[int, int]) -> tuple[tuple[int, int], Optional[go.Creature]]:
+        """The coordinates of the creature after the move and the creature that it bumped into, if any"""
         if next_coords in self._creature_coords and next_coords != old_coords:
             other_creature = self._creature_coords[next_coords]
             creature.bump_with(other_creature)
@@ -667,10 +761,12 @@ Game Over!
                 self._creature_died(other_creature)
             if other_creature is self.character and self.substate == Game.working_substate:
                 self.substate = Game.moving_substate
-        else:
-            self._creature_coords.pop(old_coords)
-            self._creature_coords[next_coords] = creature
-            creature.traverse(self._current_location.tile_at(next_coords))
+            return old_coords, other_creature
+        self._creature_coords.pop(old_coords)
+        self._creature_coords[next_coords] = creature
+        creature.traverse(self.active_area.tile_at(next_coords),
+                          self.active_area.passage_cost(creature, next_coords))
+        return next_coords, None
 
     def _move_character(self, direction: str) -> None:
         direction = self.character.confirm_movement_direction(direction)
@@ -684,7 +780,7 @@ Game Over!
             return
         else:
             self._last_character_target = None
-        old_location = self._current_location
+        old_area = self.active_area
         new_location = self.World.get_location(new_coords)
         new_tile = new_location.tile_at(new_coords)
         if problem_with_passage := self.character.can_traverse(new_tile):
@@ -693,16 +789,46 @@ Game Over!
             self._creature_coords.pop(old_coords)
             self._creature_coords[new_coords] = self.character
             self._current_location = new_location
-            if self._current_location is not old_location:
-                old_location.stored_creatures = []
-                for coords in list(self._creature_coords):
-                    if self._creature_coords[coords] is not self.character:
-                        old_location.stored_creatures.append(self._creature_coords.pop(coords))
-                self.character.ranged_target = None
-                self._creature_coords = self._current_location.load_creatures(self._creature_coords, self._turn)
+            if self._current_location is not old_area.center:
+                self._shift_active_area(old_area, self.active_area)
             else:
                 self.character.traverse(self._current_location.tile_at(new_coords))
 
+    @profiler.timed('shift_area')
+    def _shift_active_area(self, old_area: ActiveArea, new_area: ActiveArea) -> None:
+        """Store the creatures of the locations that left the active area and load those of the new ones"""
+        for top_left, location in old_area.locations.items():
+            if top_left in new_area.locations:
+                continue
+            stored_creatures = []
+            for coords in list(self._creature_coords):
+                if location.contains_coords(coords) and self._creature_coords[coords] is not self.character:
+                    stored_creatures.append(self._creature_coords.pop(coords))
+            for creature in stored_creatures:
+                self._forget_creature(creature)
+            # The location may still hold creatures that found no room when it was loaded
+            location.store_creatures(location.stored_creatures + stored_creatures, self._turn)
+        if isinstance(self.character.ranged_target, tuple) \
+                and not new_area.contains_coords(self.character.ranged_target):
+            self.character.ranged_target = None
+        for top_left, location in new_area.locations.items():
+            if top_left not in old_area.locations:
+                self._creature_coords = location.load_creatures(self._creature_coords, self._turn)
+        self._trim_world(new_area)
+
+    def _trim_world(self, area: ActiveArea) -> None:
+        """
+        Let the world forget the locations that were not visited lately, keeping their changes in saved form
+        The game refers to the objects of the locations around the character and of those with effects on the ground.
+        """
+        keep = set(area.locations) | self._turn_effects.locations()
+        keep.update(self._offscreen_simulation.nearby(area.center.top_left, self.World,
+                                                      config.offscreen_simulation_radius))
+        for location in self.World.trim_locations(keep):
+            if location.has_changes:
+                saving.stash_location(location, self.World)
+                profiler.count('stashed_locations')
+
     def _get_coords_of_creature(self, creature: go.Creature) -> tuple[int, int]:
         for coords in self._creature_coords:
             if self._creature_coords[coords] is creature:
@@ -827,6 +953,7 @@ Game Over!
             phase = config.daylight_phase
         return current_day_time, phase
 
+    @profiler.timed('hud')
     def get_character_hud(self) -> str:
         # TODO: Add travel destination (chosen on map, hinted with Travelling: West-NW)
         hp_gauge = self._format_filled_gauge(self.character.hp, self.character.max_hp, config.hp_color)
@@ -847,7 +974,7 @@ Game Over!
             message = self._current_location.tile_at(self._observed_target).description
             if self._observed_target in self._creature_coords:
                 message += ' ' + self._creature_coords[self._observed_target].description
-            for effect in self._turn_effects.get(self._observed_target, []):
+            for effect in self._turn_effects.effects_at(self._observed_target):
                 if effect.is_observable:
                     message += ' ' + effect.description
         elif self._current_message:
@@ -898,10 +1025,10 @@ Game Over!
         return colored_gauge
 
     def _collate_creatures_and_effects(self) -> dict[tuple[int, int], go.GameObject]:
-        sub_turn_effect_visuals = {pos: effect['item'] for pos, effect in self._sub_turn_effects.items()}
-        combined_dict = {**self._creature_coords, **sub_turn_effect_visuals}
+        combined_dict = {**self._creature_coords, **self._projectiles.visuals()}
         return combined_dict
 
+    @profiler.timed('area_view')
     def get_area_view(self) -> str:
         if self.substate == Game.looking_substate and self.character.ranged_target is not None:
             target_from = self._get_coords_of_creature(self.character)
@@ -932,19 +1059,25 @@ Game Over!
         column = column // (config.region_size * config.location_width)
         return row, column
 
-    def get_world_data(self, blink_at: tuple[int, int]) -> str:
-        return self.World.data(blink_at, character_at=self._get_coords_of_creature(self.character))
+    @staticmethod
+    def get_world_view_top_left(selected: tuple[int, int]) -> tuple[int, int]:
+        return World.map_view_top_left(selected)
+
+    def get_world_map(self, top_left: tuple[int, int]) -> list[list[str]]:
+        return self.World.map_rows(top_left, character_at=self._get_coords_of_creature(self.character))
+
+    def get_region_map(self, coords: tuple[int, int]) -> list[list[str]]:
+        return self.World.get_region(*coords).map_rows(character_at=self._get_coords_of_creature(self.character))
+
+    def get_blinking_region_icon(self, coords: tuple[int, int]) -> str:
+        return self.World.region_icon(*coords, blinking=True)
 
-    def get_region_data(self, coords: tuple[int, int], blink_at: tuple[int, int]) -> str:
-        return (self.World
-                .contents[coords[0]][coords[1]]
-                .data(blink_at, character_at=self._get_coords_of_creature(self.character)))
+    def get_blinking_location_icon(self, region_coords: tuple[int, int], location_coords: tuple[int, int]) -> str:
+        return self.World.get_region(*region_coords).location_icon(*location_coords, blinking=True)
 
     def get_region_map_details(self, coords: tuple[int, int]) -> list[str]:
-        return self.World.contents[coords[0]][coords[1]].map_details
+        return self.World.get_region(*coords).map_details
 
     def get_location_map_details(self, region_coords: tuple[int, int],
                                  location_coords: tuple[int, int]) -> list[str]:
-        region = self.World.contents[region_coords[0]][region_coords[1]]
-        location = region.contents[location_coords[0]][location_coords[1]]
-        return location.map_details
+        return self.World.get_region(*region_coords).location_map_details(*location_coords)
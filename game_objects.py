@@ -49,16 +49,27 @@ class Effect(GameObject):
             raise ValueError(f"Effect {self.name} cannot have None as a tile!")
         super().__init__(**kwargs)
         self.is_observable = is_observable
-        self._color_range = color_range or [self.color]
+        # Console colors are not picklable, keep their escape codes as strings like GameObject does
+        self._color_range = [str(color) for color in color_range] if color_range else [self.color]
         self._tile = tile
         self.color = self._color_range[0]
         self._duration = duration
+        # Kept by the EffectScheduler: the turn that the duration is up to date with and the turn of the next change
+        self.updated_turn = 0
+        self.next_change_turn: Optional[int] = None
 
-    def tick(self, creature: 'Creature' = None) -> None:
-        self.duration -= 1
-        self.color = random.choice(self._color_range)
+    def tick(self, creature: 'Creature' = None, turns: int = 1) -> None:
+        self.duration -= turns
         self._tick_specific_effects(creature)
 
+    def flicker(self) -> None:
+        """The purely cosmetic part of a turn, only worth doing while the effect can be seen"""
+        self.color = random.choice(self._color_range)
+
+    def turns_to_next_change(self) -> int:
+        """How many turns the effect can be left alone before its state has to change, at the latest when it ends"""
+        return self.duration
+
     @property
     def duration(self) -> int:
         return self._duration
@@ -383,11 +394,14 @@ class PowerSource(ResourceSource):
             raise ValueError(f"PowerResource name must support formatting, but got '{name}'!")
         super().__init__(resource, name=name, icon='*', description=description, **kwargs)
 
+    medium_amount = 15
+    strong_amount = 30
+
     @property
     def name(self) -> str:
-        if self.contained_amount < 15:
+        if self.contained_amount < self.medium_amount:
             strength = 'weak'
-        elif self.contained_amount < 30:
+        elif self.contained_amount < self.strong_amount:
             strength = 'medium'
         else:
             strength = 'strong'
@@ -603,7 +617,7 @@ class Creature(GameObject):
         self.stats = self.species.base_stats.copy()
         self._effect_modifiers = self.species.base_effect_modifiers
         self._resistances_and_affinities = self.species.base_resistances_and_affinities
-        self._active_effects: dict[str, int] = self.species.active_effects
+        self._active_effects: dict[str, int] = self.species.active_effects.copy()
         self.equipment_slots = self.species.equipment_slots
         self.equipped_items = {k: Item.empty_space for k in self.equipment_slots}
         for item_type in self.species.initial_equipment:
@@ -759,6 +773,30 @@ class Creature(GameObject):
             if value <= 0:
                 self._active_effects.pop(effect)
 
+    def live_offscreen(self, turns: int) -> None:
+        """
+        Advance live() by many turns at once, for creatures in locations away from the character
+        Uses the expected outcome of the random rolls of live() instead of rolling them every turn
+        """
+        self._age += turns
+        self._get_hungry(turns * config.default_sustenance_per_turn)
+        endurance = self.stats[config.End]
+        for effect, value in self._active_effects.items():
+            if effect in [config.sick_effect, config.drunk_effect]:
+                recovery_chance = 1 - value / (value + endurance)
+                self._active_effects[effect] -= round(turns * recovery_chance)
+            elif effect == config.non_rest_energy_regen_effect:
+                regen_chance = (min(int(endurance), config.max_stat_value) + 1) / (config.max_stat_value + 1)
+                self.energy += round(turns * regen_chance)
+            elif effect == config.non_rest_hp_regen_effect:
+                regen_chance = (min(int(endurance / 2), config.max_stat_value) + 1) / (config.max_stat_value + 1)
+                self.hp += round(turns * regen_chance)
+            else:
+                raise ValueError(f"Unhandled effect '{effect}'!")
+        for effect, value in list(self._active_effects.items()):
+            if value <= 0:
+                self._active_effects.pop(effect)
+
     def can_consume(self, item: Item) -> bool:
         if isinstance(item, LiquidContainer):
             item = item.liquid
@@ -1011,17 +1049,30 @@ class Creature(GameObject):
         modifier = self._get_effect_modifier(skill_name)
         return int(raw_skill * modifier)
 
+    @property
+    def traversal_profile(self) -> Optional[tuple]:
+        """Creatures with the same profile pay the same passage costs, None if the costs change with training"""
+        return None
+
+    def passage_cost(self, tile: 'Tile') -> int:
+        return self.get_final_effect_size(*tile.passage_cost)
+
     def can_traverse(self, tile: 'Tile') -> str:
-        cost_type, passage_cost = list(tile.effects[config.terrain_passage_cost].items())[0]
-        final_cost = self.get_final_effect_size(cost_type, passage_cost)
+        return self.passage_problem(self.passage_cost(tile))
+
+    def passage_problem(self, final_cost: int) -> str:
         if self.max_energy < final_cost:
             return 'You cannot go there!'
         if self.energy < final_cost:
             return 'You are too tired to move forward!'
         return ''
 
-    def traverse(self, tile: 'Tile') -> None:
-        self.apply_effects(tile.effects[config.terrain_passage_cost])
+    def traverse(self, tile: 'Tile', final_cost: Optional[int] = None) -> None:
+        """Pay for entering the tile, final_cost is the already known passage_cost() of the tile"""
+        if final_cost is None:
+            self.apply_effects(tile.effects[config.terrain_passage_cost])
+        else:
+            self._apply_effect(tile.passage_cost[0], final_cost)
 
     def get_skills_data(self) -> dict[str, int]:
         return {skill: self._effective_skill(skill) for skill in self._skills}
@@ -1046,6 +1097,11 @@ class Animal(Creature):
     def _get_weapons(self) -> list[Weapon]:
         return [self.equipped_items[config.animal_weapon_slot]]
 
+    @property
+    def traversal_profile(self) -> tuple:
+        # Animals never train, so their passage costs only depend on their species and kinds of equipment
+        return self.species, tuple(map(type, self.equipped_items.values()))
+
 
 class Humanoid(Creature):
     def __init__(self, species: HumanoidSpecies, **kwargs):
@@ -1288,13 +1344,47 @@ class FlavorTerrain(Terrain):
 
 
 class Tile(PhysicalContainer):
-    def __init__(self, terrain: Terrain):
+    def __init__(self, terrain: Terrain, coords: tuple[int, int] = None, listener=None):
+        """
+        The listener (the owning Location) is notified through tile_changed(tile)
+        whenever the terrain or the items on the tile change
+        """
+        self._listener = None
         super().__init__(height=config.tile_size, width=config.tile_size)
+        self.coords = coords
         self.terrain = terrain
         for source in self.terrain.substances:
             self.add_item(source)
         self._transformations = {}
         self._last_skill_applied: Optional[str] = None
+        self._listener = listener
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_listener']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._listener = None
+
+    def _changed(self) -> None:
+        if self._listener is not None:
+            self._listener.tile_changed(self)
+
+    def add_item(self, item: Item, ignore_stackability: bool = False) -> None:
+        super().add_item(item, ignore_stackability)
+        self._changed()
+
+    def remove_item(self, item: Item) -> None:
+        super().remove_item(item)
+        self._changed()
+
+    def provide_item(self, max_weight: int, item: Item, max_amount: int = None) -> Item:
+        # Splitting a stack changes the tile without removing anything from it
+        provided_item = super().provide_item(max_weight, item, max_amount)
+        self._changed()
+        return provided_item
 
     @property
     def name(self):
@@ -1304,6 +1394,11 @@ class Tile(PhysicalContainer):
     def effects(self) -> dict:
         return self.terrain.effects
 
+    @property
+    def passage_cost(self) -> tuple[str, int]:
+        """The kind and size of the cost of entering the tile"""
+        return next(iter(self.terrain.effects[config.terrain_passage_cost].items()))
+
     @property
     def hp(self) -> int:
         return 100 - self._transformations.get(self._last_skill_applied, 0)
@@ -1314,6 +1409,7 @@ class Tile(PhysicalContainer):
 
     def apply_skill(self, skill: str, strength: int) -> tuple[list[Item], str]:
         self._last_skill_applied = skill
+        self._changed()
         self._transformations[skill] = self._transformations.get(skill, 0) + strength
         if self._transformations[skill] >= 100:
             return self._apply_transformation(skill)
@@ -1322,6 +1418,7 @@ class Tile(PhysicalContainer):
     def _apply_transformation(self, skill: str) -> tuple[list[Item], str]:
         transformation_result = self.terrain.transformations[skill]
         self.terrain = transformation_result['new_terrain']
+        self._changed()
         drops = []
         for x in range(transformation_result['number_of_drops']):
             item_type = random.choices(transformation_result['drop_types'],
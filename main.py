@@ -1,6 +1,9 @@
+import os
+
 from userinterface import UserInterface
 from sequence import GameSequence
 from game import Game
+from profiling import profiler
 
 
 def get_new_main_screen() -> UserInterface:
@@ -9,6 +12,9 @@ def get_new_main_screen() -> UserInterface:
     return UserInterface(game, sequence)
 
 
+if os.environ.get('BALANCE_PROFILE'):
+    # One JSON line per turn goes to the named file, e.g. to attach to a bug report
+    profiler.enable(os.environ['BALANCE_PROFILE'])
 main_screen = get_new_main_screen()
 playing = main_screen.process_player_input()
 while playing:
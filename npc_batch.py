@@ -0,0 +1,208 @@
+"""
+Batched turns for the NPCs of the active area
+The hot creature fields, positions included, are copied into parallel lists once per turn. Living runs over
+the lists, and the results are written back to the creatures. The goals of creatures with no humanoid in range
+are decided from their rows. Chasing, fleeing, bumping into other creatures and resting still go through the
+creature objects. The rows of the creatures that they change are read again, so the rest of the turn sees the changes.
+"""
+import collections
+import functools
+import random
+from typing import Optional
+
+import config
+from game_objects import Creature, HumanoidSpecies
+from utils import coord_distance
+
+
+# The rolls of a batch are integers below this, a chance p passes for rolls below p * _roll_range
+_roll_range = 2 ** 32
+
+
+def _random_rolls(count: int) -> list[int]:
+    """Rolls in [0, _roll_range), all taken from one draw of the generator"""
+    if not count:
+        return []
+    return memoryview(random.getrandbits(32 * count).to_bytes(4 * count, 'little')).cast('I').tolist()
+
+
+@functools.lru_cache(maxsize=None)
+def _roll_chance(threshold: float) -> float:
+    """The chance that random.randint(0, config.max_stat_value) <= threshold, scaled to the range of the rolls"""
+    return min(max(int(threshold) + 1, 0), config.max_stat_value + 1) / (config.max_stat_value + 1) * _roll_range
+
+
+class NpcBatch:
+    def __init__(self, creatures: list[Creature], coords: list[tuple[int, int]] = None):
+        self.creatures = creatures
+        self._index = {id(creature): index for index, creature in enumerate(creatures)}
+        # Where the creatures are, needed for their goals
+        self.coords = list(coords) if coords is not None else [None] * len(creatures)
+        self.hp = [creature._hp for creature in creatures]
+        self.energy = [creature._energy for creature in creatures]
+        # The maximums go through the equipment of the creature, so they are only looked up when needed
+        self._max_hp: list[Optional[int]] = [None] * len(creatures)
+        self._max_energy: list[Optional[int]] = [None] * len(creatures)
+        self._shared_maximums: dict[tuple, int] = {}
+        self.hunger = [creature._hunger for creature in creatures]
+        self.thirst = [creature._thirst for creature in creatures]
+        self.sustenance = [creature._sustenance_needs for creature in creatures]
+        self.endurance = [creature.stats[config.End] for creature in creatures]
+        self.effects = [creature._active_effects for creature in creatures]
+        self.species = [creature.species for creature in creatures]
+        self.disposition = [creature._disposition for creature in creatures]
+        # Indices of the creatures whose hp, energy, hunger or thirst have to be written back
+        self._changed: set[int] = set()
+
+    def refresh(self, creature: Creature, coords: tuple[int, int] = None) -> None:
+        """
+        Read the row of a creature again after the object code changed it, e.g. by moving it, resting,
+        or bumping into it. Creatures outside the batch are ignored.
+        """
+        index = self._index.get(id(creature))
+        if index is None:
+            return
+        if coords is not None:
+            self.coords[index] = coords
+        self.hp[index] = creature._hp
+        self.energy[index] = creature._energy
+        self.hunger[index] = creature._hunger
+        self.thirst[index] = creature._thirst
+        self.sustenance[index] = creature._sustenance_needs
+        self.disposition[index] = creature._disposition
+
+    def _shared_maximum(self, index: int, name: str) -> int:
+        """
+        The maximum is shared by the creatures with the same species, stats, skills, effect modifiers
+        and kinds of equipment, which is all that the maximums depend on
+        """
+        creature = self.creatures[index]
+        key = (name, creature.species, tuple(creature.stats.items()), tuple(sorted(creature._skills.items())),
+               tuple(sorted(creature._effect_modifiers.items())), tuple(map(type, creature.equipped_items.values())))
+        if key not in self._shared_maximums:
+            self._shared_maximums[key] = getattr(creature, name)
+        return self._shared_maximums[key]
+
+    def max_hp(self, index: int) -> int:
+        if self._max_hp[index] is None:
+            self._max_hp[index] = self._shared_maximum(index, 'max_hp')
+        return self._max_hp[index]
+
+    def max_energy(self, index: int) -> int:
+        if self._max_energy[index] is None:
+            self._max_energy[index] = self._shared_maximum(index, 'max_energy')
+        return self._max_energy[index]
+
+    def _usable_energy(self, index: int) -> int:
+        max_energy = self.max_energy(index)
+        sustenance_modifier = (self.hunger[index] + self.thirst[index]) // 10 * 10
+        return max_energy - max_energy * sustenance_modifier // 100
+
+    def live(self) -> None:
+        """Creature.live() for the whole batch, written back to the creatures"""
+        sustenance_rate = config.default_sustenance_per_turn * config.endurance_to_energy_rate
+        self.sustenance = [value + config.default_sustenance_per_turn for value in self.sustenance]
+        for index in [index for index, value in enumerate(self.sustenance) if value >= sustenance_rate]:
+            famine = self.sustenance[index] // sustenance_rate
+            self.hunger[index] = min(50, self.hunger[index] + famine)
+            self.thirst[index] = min(50, self.thirst[index] + famine)
+            self.sustenance[index] %= sustenance_rate
+            self.energy[index] = min(self._usable_energy(index), self.energy[index])
+            self._changed.add(index)
+        self._tick_effects()
+        for creature, sustenance in zip(self.creatures, self.sustenance):
+            creature._age += 1
+            creature._sustenance_needs = sustenance
+        for index in self._changed:
+            creature = self.creatures[index]
+            creature._hp = self.hp[index]
+            creature._energy = self.energy[index]
+            creature._hunger = self.hunger[index]
+            creature._thirst = self.thirst[index]
+        self._changed.clear()
+
+    def _tick_effects(self) -> None:
+        """
+        Tick the active effects kind by kind, drawing the random numbers of each kind in one go
+        The chances are those of Creature.live()
+        """
+        creatures_by_effect = collections.defaultdict(list)
+        for index, active_effects in enumerate(self.effects):
+            for effect in active_effects:
+                creatures_by_effect[effect].append(index)
+        run_out = []
+        endurance = self.endurance
+        for effect, indices in creatures_by_effect.items():
+            rolls = _random_rolls(len(indices))
+            if effect in [config.sick_effect, config.drunk_effect]:
+                for index, roll in zip(indices, rolls):
+                    value = self.effects[index][effect]
+                    if roll > value / (value + endurance[index]) * _roll_range:
+                        value -= 1
+                        self.effects[index][effect] = value
+                    if value <= 0:
+                        run_out.append((index, effect))
+                continue
+            if effect == config.non_rest_energy_regen_effect:
+                for index in [index for index, roll in zip(indices, rolls) if roll < _roll_chance(endurance[index])]:
+                    self.energy[index] = min(self._usable_energy(index), max(0, self.energy[index] + 1))
+                    self._changed.add(index)
+            elif effect == config.non_rest_hp_regen_effect:
+                for index in [index for index, roll in zip(indices, rolls)
+                              if roll < _roll_chance(endurance[index] / 2)]:
+                    self.hp[index] = min(self.max_hp(index), self.hp[index] + 1)
+                    self._changed.add(index)
+            else:
+                raise ValueError(f"Unhandled effect '{effect}'!")
+            run_out += [(index, effect) for index in indices if self.effects[index][effect] <= 0]
+        for index, effect in run_out:
+            self.effects[index].pop(effect, None)
+
+    @staticmethod
+    def humanoid_coords(creature_coords: dict[tuple[int, int], Creature]) -> list[tuple[int, int]]:
+        """Where the detected humanoids are, the only creatures that the basic AI reacts to"""
+        return [coords for coords, creature in creature_coords.items()
+                if creature.is_detected and isinstance(creature.species, HumanoidSpecies)]
+
+    def _can_traverse(self, index: int, coords: tuple[int, int], area) -> bool:
+        """Navigation.can_traverse() with the energy of the batch"""
+        final_cost = area.passage_cost(self.creatures[index], coords)
+        return final_cost <= self.energy[index] and final_cost <= self.max_energy(index)
+
+    def quick_goal(self, index: int, area,
+                   humanoid_coords: list[tuple[int, int]]) -> Optional[tuple[str, tuple[int, int]]]:
+        """
+        The goal that the creature of the row pursues this turn and its next coordinates,
+        None if it needs the full goal logic
+        The basic AI only reacts to humanoids. Without any in range, chasing and fleeing stay in place,
+        so the goal comes down to a random walk or to resting, which need no other creatures.
+        """
+        if isinstance(self.species[index], HumanoidSpecies):
+            return None
+        coords = self.coords[index]
+        goals = self.species[index].ai[self.disposition[index]]
+        for goal in goals:
+            if goal in [config.chase_humanoid_behavior, config.run_from_humanoid_behavior]:
+                radius = self.creatures[index].perception_radius
+                for other_coords in humanoid_coords:
+                    distance = coord_distance(coords, area.nearest_coords(coords, other_coords))
+                    if distance < radius or (distance == radius and goal == config.run_from_humanoid_behavior):
+                        return None
+                if goal != goals[-1]:
+                    continue
+                return goal, coords
+            elif goal == config.random_behavior:
+                return goal, self._random_step(index, coords, area)
+            elif goal == config.resting_behavior:
+                return goal, coords
+            else:
+                return None
+        return None
+
+    def _random_step(self, index: int, coords: tuple[int, int], area) -> tuple[int, int]:
+        """Navigation._choose_random_passable_neighbor() with the energy of the batch"""
+        neighbors = area._all_neighbors(coords)
+        for new_coords in random.sample(neighbors, len(neighbors)):
+            if self._can_traverse(index, new_coords, area):
+                return new_coords
+        return coords
@@ -0,0 +1,148 @@
+"""
+Named timers and counters that show where the turn time goes
+The profiler is off until enable() is called, e.g. by main.py when BALANCE_PROFILE names a file. While it is off,
+the timed functions and sections only check a flag. Every finished turn becomes one record with the time and calls
+of each timer, keyed by the path of the timers around it, and the counters of the turn.
+The records are written as JSON lines, and the timers can be exported as folded stacks for flame graph tools.
+"""
+import collections
+import functools
+import json
+import time
+from typing import Callable, Optional
+
+import config
+
+
+class _Timer:
+    """The context of one timed section"""
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self) -> None:
+        self._profiler._stack.append(self._name)
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exception_info) -> None:
+        elapsed = time.perf_counter_ns() - self._start
+        profiler = self._profiler
+        if not profiler.enabled:
+            # Profiling was switched off within the section
+            return
+        path = ';'.join(profiler._stack)
+        profiler._stack.pop()
+        timing = profiler._timings.get(path)
+        if timing is None:
+            profiler._timings[path] = [elapsed, 1]
+        else:
+            timing[0] += elapsed
+            timing[1] += 1
+
+
+class _Untimed:
+    """The context of a section while the profiler is off"""
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exception_info) -> None:
+        pass
+
+
+_untimed = _Untimed()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.turns: collections.deque[dict] = collections.deque(maxlen=config.profiled_turns_kept)
+        self._stack: list[str] = []
+        # Nanoseconds and calls by timer path, and counter values, since the last finished turn
+        self._timings: dict[str, list[int]] = {}
+        self._counters: collections.Counter[str] = collections.Counter()
+        self._log_file = None
+
+    def enable(self, log_file_name: str = None) -> None:
+        """Start profiling, appending each finished turn to the log file as a JSON line if one is given"""
+        self.disable()
+        self._timings.clear()
+        self._counters.clear()
+        if log_file_name is not None:
+            self._log_file = open(log_file_name, 'a')
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._stack.clear()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def timer(self, name: str):
+        """A context that times the section within it: with profiler.timer('name'): ..."""
+        return _Timer(self, name) if self.enabled else _untimed
+
+    def timed(self, name: str) -> Callable:
+        """Decorate a function to time each call under the name"""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Timer(self, name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if self.enabled:
+            self._counters[name] += amount
+
+    def end_turn(self, turn: int) -> None:
+        """Close the record of the turn, which also holds what was timed since the previous turn ended"""
+        if not self.enabled:
+            return
+        record = {'turn': turn,
+                  'timers': {path: {'ms': nanoseconds / 1e6, 'calls': calls}
+                             for path, (nanoseconds, calls) in self._timings.items()},
+                  'counters': dict(self._counters)}
+        self.turns.append(record)
+        if self._log_file is not None:
+            self._log_file.write(json.dumps(record) + '\n')
+            self._log_file.flush()
+        self._timings.clear()
+        self._counters.clear()
+
+    def write_json_lines(self, file_name: str) -> None:
+        """The kept turn records, one JSON object per line"""
+        with open(file_name, 'w') as profile_file:
+            for record in self.turns:
+                profile_file.write(json.dumps(record) + '\n')
+
+    def folded_stacks(self, records: Optional[list[dict]] = None) -> list[str]:
+        """
+        The self time of each timer path over the records, in microseconds, one 'outer;inner value' line per path
+        The kept turns are used without records. Flame graph tools add the children back to their parents.
+        """
+        totals = collections.Counter()
+        for record in self.turns if records is None else records:
+            for path, timing in record['timers'].items():
+                totals[path] += timing['ms'] * 1000
+        self_times = totals.copy()
+        for path, total in totals.items():
+            parent = path.rpartition(';')[0]
+            if parent in self_times:
+                self_times[parent] -= total
+        return [f'{path} {max(0, round(self_time))}' for path, self_time in sorted(self_times.items())]
+
+    def write_folded_stacks(self, file_name: str) -> None:
+        with open(file_name, 'w') as profile_file:
+            profile_file.write('\n'.join(self.folded_stacks()) + '\n')
+
+
+profiler = Profiler()
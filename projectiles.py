@@ -0,0 +1,114 @@
+"""
+Projectiles in flight
+Every projectile keeps a cursor into its precomputed path and moves one cell per sub-turn tick.
+The flying projectiles are indexed by cell, so any number of them can share a cell, as the arrows of a volley do.
+"""
+from typing import Optional
+
+from game_objects import Creature, Item
+
+
+class Projectile:
+    def __init__(self, item: Item, path: list[tuple[int, int]], effects: dict):
+        if not path:
+            raise ValueError(f"Projectile {item.name} cannot fly along an empty path!")
+        self.item = item
+        self.path = path
+        self.effects = effects
+        self.cursor = 0
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return self.path[self.cursor]
+
+    @property
+    def next_position(self) -> Optional[tuple[int, int]]:
+        return self.path[self.cursor + 1] if self.cursor + 1 < len(self.path) else None
+
+    @property
+    def is_at_path_end(self) -> bool:
+        return self.cursor == len(self.path) - 1
+
+
+class Landing:
+    """Where a projectile stopped and the creature that it hit, if any"""
+    def __init__(self, projectile: Projectile, position: tuple[int, int], creature: Optional[Creature] = None):
+        self.projectile = projectile
+        self.position = position
+        self.creature = creature
+
+
+class ProjectileEngine:
+    def __init__(self):
+        self._cells: dict[tuple[int, int], list[Projectile]] = {}
+        self.launched = 0
+
+    def __len__(self) -> int:
+        return sum(len(projectiles) for projectiles in self._cells.values())
+
+    @property
+    def in_flight(self) -> bool:
+        return bool(self._cells)
+
+    def launch(self, item: Item, path: list[tuple[int, int]], effects: dict) -> Projectile:
+        projectile = Projectile(item, path, effects)
+        self._cells.setdefault(projectile.position, []).append(projectile)
+        self.launched += 1
+        return projectile
+
+    def visuals(self) -> dict[tuple[int, int], Item]:
+        return {position: projectiles[0].item for position, projectiles in self._cells.items()}
+
+    def tick(self, creature_coords: dict[tuple[int, int], Creature]) -> list[Landing]:
+        """
+        Move every projectile by one cell and return those that stopped
+        A projectile stops at the end of its path, when it enters the cell of a creature or when a creature
+        steps into it, and when it meets another projectile head-on. Projectiles flying the same way pass freely.
+        """
+        if not self._cells:
+            return []
+        landings = []
+        stopped = set()
+        heading = {}
+        arriving: dict[tuple[int, int], list[Projectile]] = {}
+        for position, projectiles in self._cells.items():
+            for projectile in projectiles:
+                if position in creature_coords:
+                    landings.append(Landing(projectile, position, creature_coords[position]))
+                    stopped.add(id(projectile))
+                elif projectile.is_at_path_end:
+                    landings.append(Landing(projectile, position))
+                    stopped.add(id(projectile))
+                else:
+                    heading[id(projectile)] = projectile.next_position
+                    arriving.setdefault(projectile.next_position, []).append(projectile)
+        for position, projectiles in self._cells.items():
+            for projectile in projectiles:
+                if id(projectile) in stopped:
+                    continue
+                next_position = heading[id(projectile)]
+                # Head-on means swapping cells or entering the same cell from opposite sides
+                opposite = (2 * next_position[0] - position[0], 2 * next_position[1] - position[1])
+                oncoming = next((other for other in self._cells.get(next_position, [])
+                                 if id(other) not in stopped and heading.get(id(other)) == position), None) \
+                    or next((other for other in arriving[next_position]
+                             if id(other) not in stopped and other.position == opposite), None)
+                if oncoming is not None:
+                    landings.append(Landing(oncoming, next_position))
+                    stopped.add(id(oncoming))
+                    landings.append(Landing(projectile, next_position))
+                elif next_position in creature_coords:
+                    landings.append(Landing(projectile, next_position, creature_coords[next_position]))
+                elif projectile.cursor + 2 == len(projectile.path):
+                    landings.append(Landing(projectile, next_position))
+                else:
+                    continue
+                stopped.add(id(projectile))
+        cells = {}
+        for projectiles in self._cells.values():
+            for projectile in projectiles:
+                if id(projectile) not in stopped:
+                    projectile.cursor += 1
+                    cells.setdefault(projectile.position, []).append(projectile)
+        self._cells = cells
+        return landings
@@ -0,0 +1,359 @@
+"""
+Saved games store the world seed, the game state and the changes to the generated locations.
+The world itself is regenerated from the seed on load, so the file size and the save/load times
+depend on what the player changed instead of on how much of the world was explored.
+
+File layout: magic, header pickle, index pickle, then zlib-compressed chunks - one for the game
+state and one per changed location. Locations are unpacked only when the game first visits them.
+"""
+import atexit
+import collections
+import io
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+
+import game_objects as go
+import items
+import species
+import world
+import config
+
+save_format_version = 7
+_magic = b'BALANCE SAVE\n'
+_shared_object_modules = [go, items, species, world]
+_modules_by_name = {module.__name__: module for module in _shared_object_modules}
+_shared_objects: dict[int, tuple] = {}
+
+
+def _get_shared_objects() -> dict[int, tuple]:
+    """Module-level game objects (terrains, species, liquids...) are saved by name instead of by value"""
+    if not _shared_objects:
+        for module in _shared_object_modules:
+            for name, value in vars(module).items():
+                if isinstance(value, go.GameObject):
+                    _shared_objects.setdefault(id(value), ('shared', module.__name__, name))
+        _shared_objects[id(go.Item.empty_space)] = ('empty_space',)
+    return _shared_objects
+
+
+class _GamePickler(pickle.Pickler):
+    def __init__(self, file, tile_items: dict[int, tuple] = None):
+        """tile_items maps the ids of items lying in saved tiles to their position, as they are saved elsewhere"""
+        super().__init__(file, -1)
+        self._tile_items = tile_items or {}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, go.Tile) and obj.coords is not None:
+            return 'tile', obj.coords
+        if isinstance(obj, world.Location):
+            return 'location', obj.top_left
+        return _get_shared_objects().get(id(obj)) or self._tile_items.get(id(obj))
+
+
+class _GameUnpickler(pickle.Unpickler):
+    def __init__(self, file, game_world: world.World):
+        super().__init__(file)
+        self._world = game_world
+
+    def persistent_load(self, persistent_id):
+        kind, *arguments = persistent_id
+        if kind == 'tile':
+            return self._world.get_location(arguments[0]).tile_at(arguments[0])
+        elif kind == 'tile_item':
+            coords, row, column = arguments
+            return self._world.get_location(coords).tile_at(coords).contents[row][column]
+        elif kind == 'location':
+            return self._world.get_location(arguments[0])
+        elif kind == 'shared':
+            module_name, name = arguments
+            return getattr(_modules_by_name[module_name], name)
+        elif kind == 'empty_space':
+            return go.Item.empty_space
+        raise pickle.UnpicklingError(f'Unknown persistent object "{persistent_id}" in saved game!')
+
+
+class SavedGameHeader:
+    """
+    The first, small pickle in a saved game file
+    Holds what the load screen shows, so that listing the saved games does not load any of them
+    """
+
+    def __init__(self, file_name: str, header: dict):
+        self.file_name = file_name
+        self.name: str = header['name']
+        self.color: str = header['color']
+        self.species_name: str = header['species']
+        self.turns: int = header['turns']
+        self.saved_at: float = header['saved_at']
+        self.file_size = os.path.getsize(file_name)
+
+    @property
+    def description(self) -> str:
+        saved_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.saved_at))
+        return f"{self.species_name}, {self.turns} turns, saved {saved_at} ({self.file_size // 1024 + 1} KB)"
+
+
+class _LocationChunk:
+    """The saved changes of a location, unpacked on the first visit after loading"""
+
+    def __init__(self, blob: bytes, game_world: world.World):
+        self.blob = blob
+        self._world = game_world
+
+    def load(self) -> dict:
+        return _GameUnpickler(io.BytesIO(zlib.decompress(self.blob)), self._world).load()
+
+
+class Snapshot:
+    """The pickled parts of a saved game. Compressing them into the file contents is left to pack()"""
+
+    def __init__(self, header: dict, core: bytes, locations: dict[tuple[int, int], bytes],
+                 compressed_locations: dict[tuple[int, int], bytes]):
+        self.header = header
+        self._core = core
+        self._locations = locations
+        self._compressed_locations = compressed_locations
+
+    def pack(self) -> bytes:
+        chunks = {top_left: zlib.compress(chunk) for top_left, chunk in self._locations.items()}
+        chunks.update(self._compressed_locations)
+        blobs = [zlib.compress(self._core)]
+        index = {'core': (0, len(blobs[0])), 'locations': {}}
+        offset = len(blobs[0])
+        for top_left, blob in chunks.items():
+            index['locations'][top_left] = (offset, len(blob))
+            blobs.append(blob)
+            offset += len(blob)
+        return b''.join([_magic, pickle.dumps(self.header, -1), pickle.dumps(index, -1)] + blobs)
+
+
+def _read_header(save_file, file_name: str) -> dict:
+    if save_file.read(len(_magic)) != _magic:
+        raise ValueError(f'Unsupported saved game format in {file_name}!')
+    try:
+        header = pickle.load(save_file)
+    except (EOFError, pickle.UnpicklingError) as error:
+        raise ValueError(f'Corrupted saved game {file_name}: {error}')
+    if not isinstance(header, dict) or header.get('format') != save_format_version:
+        raise ValueError(f'Unsupported saved game format in {file_name}!')
+    return header
+
+
+def read_header(file_name: str) -> SavedGameHeader:
+    with open(file_name, 'rb') as save_file:
+        return SavedGameHeader(file_name, _read_header(save_file, file_name))
+
+
+def _dumps(obj, tile_items: dict[int, tuple] = None) -> bytes:
+    buffer = io.BytesIO()
+    _GamePickler(buffer, tile_items).dump(obj)
+    return buffer.getvalue()
+
+
+def snapshot(game) -> Snapshot:
+    """
+    Pickle the game state and the changed locations
+    Must run on the thread that plays the game, the result can then be packed and written anywhere
+    """
+    locations = {}
+    tile_items = {}
+    for location in game.World.generated_locations():
+        if location.has_changes:
+            changes = location.export_changes()
+            locations[location.top_left] = _dumps(changes)
+            # The game state can point to items on the ground, e.g. the selected one or a burning campfire
+            for coords, tile_state in changes['tiles'].items():
+                for row_index, row in enumerate(tile_state['_contents']):
+                    for column_index, item in enumerate(row):
+                        tile_items[id(item)] = ('tile_item', coords, row_index, column_index)
+    # Locations that were not visited since loading are still in their saved form
+    compressed_locations = {top_left: chunk.blob for top_left, chunk in game.World.unloaded_changes.items()}
+    state = {k: v for k, v in game.__dict__.items() if k not in game.transient_attributes}
+    header = {'format': save_format_version, 'seed': game.World.seed, 'name': game.name, 'color': game.color,
+              'species': game.character.species.name, 'turns': game.turn, 'saved_at': time.time()}
+    core = _dumps({'game_class': type(game), 'state': state}, tile_items)
+    return Snapshot(header, core, locations, compressed_locations)
+
+
+def stash_location(location: world.Location, game_world: world.World) -> None:
+    """Keep the changes of a location that the world forgets in their saved form, until its next visit"""
+    game_world.unloaded_changes[location.top_left] = _LocationChunk(zlib.compress(_dumps(location.export_changes())),
+                                                                    game_world)
+
+
+def write_snapshot(game_snapshot: Snapshot, file_name: str) -> None:
+    """Write to a temporary file first, so that a crash never leaves a half-written save behind"""
+    data = game_snapshot.pack()
+    file_descriptor, temporary_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_name)),
+                                                       suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temporary_file:
+            temporary_file.write(data)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        os.replace(temporary_name, file_name)
+    except BaseException:
+        os.remove(temporary_name)
+        raise
+
+
+def save_game(game, file_name: str) -> None:
+    write_snapshot(snapshot(game), file_name)
+
+
+def load_game(file_name: str):
+    """Unpack the game state; of the saved locations only those that the state refers to are unpacked"""
+    with open(file_name, 'rb') as save_file:
+        header = _read_header(save_file, file_name)
+        index = pickle.load(save_file)
+        blobs = memoryview(save_file.read())
+    game_world = world.World(seed=header['seed'])
+    for top_left, (offset, size) in index['locations'].items():
+        game_world.unloaded_changes[top_left] = _LocationChunk(blobs[offset:offset + size], game_world)
+    offset, size = index['core']
+    payload = _GameUnpickler(io.BytesIO(zlib.decompress(blobs[offset:offset + size])), game_world).load()
+    # A fresh instance provides the runtime state that is not saved
+    game = payload['game_class']()
+    game.__dict__.update(payload['state'])
+    game.World = game_world
+    return game
+
+
+class SnapshotWriter:
+    """
+    Writes snapshots on a background thread
+    Only the newest pending snapshot of each file is written, older ones are dropped
+    """
+
+    def __init__(self):
+        self._pending: dict[str, tuple[Snapshot, Callable]] = {}
+        self._writing = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # The last error raised by an on_done callback, which must not stop the thread
+        self.callback_error: Optional[Exception] = None
+
+    def submit(self, file_name: str, game_snapshot: Snapshot, on_done: Callable) -> None:
+        """on_done(seconds, error) is called from the writer thread"""
+        with self._condition:
+            self._pending[file_name] = (game_snapshot, on_done)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything submitted so far is on disk"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                file_name = next(iter(self._pending))
+                game_snapshot, on_done = self._pending.pop(file_name)
+                self._writing = True
+            start = time.perf_counter()
+            error = None
+            try:
+                write_snapshot(game_snapshot, file_name)
+            except Exception as write_error:
+                error = write_error
+            try:
+                on_done(time.perf_counter() - start, error)
+            except Exception as callback_error:
+                self.callback_error = callback_error
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+
+snapshot_writer = SnapshotWriter()
+atexit.register(snapshot_writer.flush, 5)
+
+
+class AutoSaver:
+    """
+    Saves the game every config.autosave_period turns and whenever the character enters a new location
+    Only the snapshot runs on the game thread, the file is written by the snapshot_writer
+    Saves requested by the player are reported once a write of them or of a newer snapshot completes
+    """
+
+    def __init__(self, directory: str = '.', writer: SnapshotWriter = snapshot_writer):
+        self.enabled = True
+        self._directory = directory
+        self._writer = writer
+        self._last_save_turn: Optional[int] = None
+        self._last_location = None
+        self._messages: list[str] = []
+        self._submitted_saves = 0
+        # Only the game thread sets the reported save number, and only the writer thread sets the written one
+        self._reported_save = 0
+        self._written_save = 0
+        self.snapshot_seconds = collections.deque(maxlen=100)
+        self.write_seconds = collections.deque(maxlen=100)
+
+    def after_turn(self, game, location_key) -> Optional[str]:
+        """Autosave if it is due, return a message if an earlier save completed or failed"""
+        if not self.enabled:
+            return self.poll()
+        if self._last_save_turn is None:
+            # The first turn after starting or loading a game
+            self._last_save_turn = game.turn
+            self._last_location = location_key
+        location_changed = location_key != self._last_location
+        self._last_location = location_key
+        if location_changed or game.turn - self._last_save_turn >= config.autosave_period:
+            self.save(game)
+        return self.poll()
+
+    @property
+    def saving(self) -> bool:
+        """Whether a save requested by the player is still being written or a save message is waiting"""
+        return self._written_save < self._reported_save or bool(self._messages)
+
+    def poll(self) -> Optional[str]:
+        """Return a message about a completed player save or a failed save, if there is one"""
+        if self._messages:
+            return self._messages.pop(0)
+        return None
+
+    def save(self, game, report: bool = False) -> None:
+        """Snapshot the game and queue it for writing, report=True adds a message when the write completes"""
+        self._submitted_saves += 1
+        save_number = self._submitted_saves
+        self._last_save_turn = game.turn
+        start = time.perf_counter()
+        game_snapshot = snapshot(game)
+        self.snapshot_seconds.append(time.perf_counter() - start)
+        if report:
+            self._reported_save = save_number
+        file_name = os.path.join(self._directory, f"{game.name}.{config.saved_game_extension}")
+        self._writer.submit(file_name, game_snapshot,
+                            lambda seconds, error: self._written(save_number, seconds, error))
+
+    def _written(self, save_number: int, seconds: float, error: Optional[Exception]) -> None:
+        # The writer drops pending snapshots of the same file, so a newer save also completes the reported one
+        reported = self._written_save < self._reported_save <= save_number
+        if error is None:
+            self.write_seconds.append(seconds)
+            if reported:
+                self._messages.append("Game saved!")
+        else:
+            self._messages.append(f'{"Saving" if reported else "Autosave"} failed: {error}')
+        self._written_save = save_number
+
+    def metrics(self) -> dict[str, float]:
+        snapshots = list(self.snapshot_seconds) or [0]
+        writes = list(self.write_seconds) or [0]
+        return {'autosaves': len(self.snapshot_seconds),
+                'mean_snapshot_ms': sum(snapshots) / len(snapshots) * 1000,
+                'max_snapshot_ms': max(snapshots) * 1000,
+                'mean_write_ms': sum(writes) / len(writes) * 1000}
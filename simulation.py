@@ -0,0 +1,96 @@
+"""
+Coarse simulation of the creatures stored in the locations around the character
+Only the active area is simulated turn by turn. The locations around it get a cheap tick every
+config.offscreen_tick_period turns, in round-robin order and within config.offscreen_creature_budget,
+and any location catches up on the rest of its turns when the character enters it.
+"""
+import collections
+import random
+from typing import Optional
+
+import config
+from world import ActiveArea, Location, World
+
+
+class OffscreenSimulation:
+    def __init__(self):
+        self._center: Optional[tuple[int, int]] = None
+        self._queue: collections.deque[tuple[int, int]] = collections.deque()
+        self.ticks = 0
+        self.advanced_locations = 0
+        self.advanced_creatures = 0
+        self.wandering_creatures = 0
+
+    @staticmethod
+    def nearby(top_left: tuple[int, int], game_world: World, radius: int) -> list[tuple[int, int]]:
+        """Top lefts of the locations within the radius, wrapping around the world like movement does"""
+        world_height, world_width = game_world.size
+        nearby = []
+        for row in range(-radius, radius + 1):
+            for column in range(-radius, radius + 1):
+                if row or column:
+                    coords = ((top_left[0] + row * config.location_height) % world_height,
+                              (top_left[1] + column * config.location_width) % world_width)
+                    if coords != top_left and coords not in nearby:
+                        nearby.append(coords)
+        return nearby
+
+    def tick(self, game_world: World, active_area: ActiveArea, turn: int) -> None:
+        if turn % config.offscreen_tick_period:
+            return
+        if active_area.center.top_left != self._center:
+            self._center = active_area.center.top_left
+            self._queue = collections.deque(
+                top_left for top_left in self.nearby(self._center, game_world, config.offscreen_simulation_radius)
+                if top_left not in active_area.locations)
+        self.ticks += 1
+        budget = config.offscreen_creature_budget
+        advanced = {}
+        for _ in range(len(self._queue)):
+            location = game_world.get_loaded_location(self._queue[0])
+            if location is not None and location.last_simulated_turn is not None:
+                # A location that does not fit in the budget waits at the head of the queue for the next tick
+                if advanced and len(location.stored_creatures) > budget:
+                    break
+                budget -= len(location.stored_creatures)
+                self._advance(location, turn)
+                advanced[location.top_left] = location
+            self._queue.rotate(-1)
+        self._wander(advanced, game_world)
+
+    def _advance(self, location: Location, turn: int) -> None:
+        elapsed = turn - location.last_simulated_turn
+        survivors = []
+        for creature in location.stored_creatures:
+            creature.live_offscreen(elapsed)
+            if not creature.is_dead:
+                survivors.append(creature)
+        survivors = location.top_up_creatures(survivors, turn)
+        location.store_creatures(survivors, turn)
+        self.advanced_locations += 1
+        self.advanced_creatures += len(survivors)
+
+    def _wander(self, advanced: dict[tuple[int, int], Location], game_world: World) -> None:
+        """Creatures only move between locations that were advanced to the same turn"""
+        arrivals = collections.defaultdict(list)
+        for top_left, location in advanced.items():
+            destinations = [coords for coords in self.nearby(top_left, game_world, 1) if coords in advanced]
+            if not destinations:
+                continue
+            staying = []
+            for creature in location.stored_creatures:
+                if random.random() < config.offscreen_wander_chance:
+                    arrivals[random.choice(destinations)].append(creature)
+                    self.wandering_creatures += 1
+                else:
+                    staying.append(creature)
+            location.stored_creatures = staying
+        for top_left, creatures in arrivals.items():
+            advanced[top_left].stored_creatures += creatures
+
+    def metrics(self) -> dict[str, float]:
+        ticks = self.ticks or 1
+        return {'offscreen_ticks': self.ticks,
+                'locations_per_tick': self.advanced_locations / ticks,
+                'creatures_per_tick': self.advanced_creatures / ticks,
+                'wanderers_per_tick': self.wandering_creatures / ticks}
@@ -1,18 +1,94 @@
 import re
-from typing import Union
+from typing import Union, Iterable
 
 import console
 import config
 
-strip_sub = re.compile(r"""
+ansi_pattern = re.compile(r"""
     \x1b     # literal ESC
     \[       # literal [
     [;\d]*   # zero or more digits or semicolons
     [A-Za-z] # a letter
-    """, re.VERBOSE).sub
+    """, re.VERBOSE)
+strip_sub = ansi_pattern.sub
+
+
+class StyledText(str):
+    """
+    A string with ANSI styles that keeps the raw text and the style spans separately
+    The spans are (raw_position, escape_sequence) pairs and are only parsed when requested,
+    the visible width is known without stripping the escape sequences again
+    """
+
+    def __new__(cls, raw: str = '', spans: tuple[tuple[int, str], ...] = ()):
+        pieces = []
+        last_position = 0
+        for position, style in spans:
+            pieces += [raw[last_position:position], style]
+            last_position = position
+        pieces.append(raw[last_position:])
+        styled_text = cls._build(''.join(pieces), raw)
+        styled_text._spans = tuple(spans)
+        return styled_text
+
+    @classmethod
+    def _build(cls, rendered: str, raw: str) -> 'StyledText':
+        styled_text = super().__new__(cls, rendered)
+        styled_text.raw = raw
+        styled_text.width = len(raw)
+        styled_text._spans = None
+        return styled_text
+
+    @classmethod
+    def from_ansi(cls, colored_string: str) -> 'StyledText':
+        """Strip the escape sequences once and keep the result along with the colored string"""
+        if isinstance(colored_string, StyledText):
+            return colored_string
+        return cls._build(colored_string, strip_sub('', colored_string))
+
+    @property
+    def spans(self) -> tuple[tuple[int, str], ...]:
+        if self._spans is None:
+            spans = []
+            removed_length = 0
+            for match in ansi_pattern.finditer(self):
+                start, end = match.span()
+                spans.append((start - removed_length, match.group()))
+                removed_length += end - start
+            self._spans = tuple(spans)
+        return self._spans
+
+    def pad(self, left: int, right: int, pad_character: str = ' ') -> 'StyledText':
+        left_padding = pad_character * left
+        right_padding = pad_character * right
+        return StyledText._build(left_padding + str.__str__(self) + right_padding,
+                                 left_padding + self.raw + right_padding)
+
+    def __add__(self, other: str) -> 'StyledText':
+        other = to_styled(other)
+        return StyledText._build(str.__add__(self, other), self.raw + other.raw)
+
+    def __radd__(self, other: str) -> 'StyledText':
+        return to_styled(other) + self
+
+
+def to_styled(text) -> StyledText:
+    if isinstance(text, StyledText):
+        return text
+    return StyledText.from_ansi(str(text))
+
+
+def join_styled(separator: str, lines: Iterable[str]) -> StyledText:
+    """The StyledText equivalent of str.join"""
+    separator = to_styled(separator)
+    styled_lines = [to_styled(line) for line in lines]
+    return StyledText._build(str.join(separator, styled_lines),
+                             separator.raw.join([line.raw for line in styled_lines]))
 
 
 def strip_ansi_escape_sequences(colored_string: str) -> str:
+    if isinstance(colored_string, StyledText):
+        return colored_string.raw
     return strip_sub("", colored_string)
 
 
@@ -23,13 +99,13 @@ def get_console_color(color_string: str):
 
 
 def raw_length(colored_string: str) -> int:
+    if isinstance(colored_string, StyledText):
+        return colored_string.width
     return len(strip_ansi_escape_sequences(colored_string))
 
 
 def longest_raw_line_len(content) -> int:
-    raw_content_data = [strip_ansi_escape_sequences(line) for line in content]
-    longest_line_len = max([len(line) for line in raw_content_data])
-    return longest_line_len
+    return max([raw_length(line) for line in content])
 
 
 def dim(a_string) -> str:
@@ -41,45 +117,45 @@ def equalize_rows(contents: list[list[str]], fixed_width: int = None) -> list[li
     for content in contents:
         line_width = fixed_width or max([raw_length(line) for line in content])
         current_height = len(content)
-        content += [' ' * line_width] * max(0, max_lines - current_height)
+        content += [StyledText(' ' * line_width)] * max(0, max_lines - current_height)
     return contents
 
 
 def left_justify_ansi_multiline(content_data: list[str], max_width: int, pad_character: str = ' ') \
-        -> tuple[list[str], int, int]:
+        -> tuple[list[StyledText], int, int]:
     """
     Left-justify a multiline string using the longest content line
     """
-    longest_line_len = max([raw_length(line) for line in content_data])
+    styled_content = [to_styled(line) for line in content_data]
+    longest_line_len = max([line.width for line in styled_content])
     left_pad = (max_width - longest_line_len) // 2
     justified_content = []
     min_right_pad = max_width
-    for line in content_data:
-        right_pad = max_width - raw_length(line) - left_pad
+    for line in styled_content:
+        right_pad = max_width - line.width - left_pad
         min_right_pad = min(right_pad, min_right_pad)
-        justified_line = (pad_character * left_pad) + line + (pad_character * right_pad)
-        justified_content.append(justified_line)
+        justified_content.append(line.pad(left_pad, right_pad, pad_character))
     return justified_content, left_pad, min_right_pad
 
 
 def center_ansi_multiline(content_data: list[str], max_width: int = config.max_text_line_length,
-                          pad_character: str = ' ') -> list[str]:
+                          pad_character: str = ' ') -> list[StyledText]:
     """
     Center a multiline string using the longest content line
     """
     centered_content = []
     for line in content_data:
-        raw_len = raw_length(line)
-        left_pad = (max_width - raw_len) // 2
-        right_pad = max_width - raw_len - left_pad
+        line = to_styled(line)
+        left_pad = (max_width - line.width) // 2
+        right_pad = max_width - line.width - left_pad
         if right_pad < 0:
             raise ValueError(f"String is too long to center in {max_width} characters:\n{line}")
-        centered_content.append((pad_character * left_pad) + line + (pad_character * right_pad))
+        centered_content.append(line.pad(left_pad, right_pad, pad_character))
     return centered_content
 
 
 def columnize(data_dict: dict[str, int], rows: int, max_width: int = config.max_text_line_length,
-              fill_all_rows: bool = False) -> list[list[str]]:
+              fill_all_rows: bool = False) -> list[list[StyledText]]:
     dicts = [{k: data_dict[k] for k in list(data_dict.keys())[start:start + rows]}
              for start in range(0, len(data_dict), rows)]
     strips = [justify_ansi_dict(d, rows_needed=rows if fill_all_rows else None) for d in dicts]
@@ -87,28 +163,28 @@ def columnize(data_dict: dict[str, int], rows: int, max_width: int = config.max_
     while strips:
         remaining_width = max_width
         current_page = []
-        while strips and remaining_width >= raw_length(strips[0][0]):
-            remaining_width -= raw_length(strips[0][0]) + 1
+        while strips and remaining_width >= strips[0][0].width:
+            remaining_width -= strips[0][0].width + 1
             current_page.append(strips.pop(0))
         pages.append(current_page)
     pages = [equalize_rows(page) for page in pages]
-    combined_pages = [['|'.join(rows) for rows in zip(*[c for c in page])] for page in pages]
+    combined_pages = [[join_styled('|', rows) for rows in zip(*[c for c in page])] for page in pages]
     return combined_pages
 
 
-def justify_ansi_dict(data_dict: dict[str, Union[int, str]], rows_needed: int = None) -> list[str]:
+def justify_ansi_dict(data_dict: dict[str, Union[int, str]], rows_needed: int = None) -> list[StyledText]:
     if not data_dict:
         return []
-    max_key_len = max([raw_length(key) for key in data_dict])
-    max_value_len = max([raw_length(str(value)) for value in data_dict.values()])
+    styled_items = [(to_styled(key), to_styled(value)) for key, value in data_dict.items()]
+    max_key_len = max([key.width for key, _ in styled_items])
+    max_value_len = max([value.width for _, value in styled_items])
     max_len = max_value_len + max_key_len + 1
     content = []
-    for key, value in data_dict.items():
-        current_len = raw_length(key) + raw_length(str(value))
-        padding = ' ' * (max_len - current_len)
-        content.append(f"{key}{padding}{value}")
+    for key, value in styled_items:
+        padding = max_len - key.width - value.width
+        content.append(key.pad(0, padding) + value)
     if rows_needed is not None and len(content) < rows_needed:
-        extra_rows = [' ' * max_len] * (rows_needed - len(content))
+        extra_rows = [StyledText(' ' * max_len)] * (rows_needed - len(content))
         content += extra_rows
     return content
 
@@ -149,28 +225,6 @@ def cmp(a: int, b: int) -> int:
         return 0
 
 
-def direct_path(a: tuple[int, int], b: tuple[int, int]) -> list[tuple[int, int]]:
-    path = [a[:]]
-    dif = [abs(a[0] - b[0]), abs(a[1] - b[1])]
-    direction_steps = [0, 0]
-    if abs(a[0] - b[0]):
-        direction_steps[0] = (b[0] - a[0]) // abs(a[0] - b[0])
-    if abs(a[1] - b[1]):
-        direction_steps[1] = (b[1] - a[1]) // abs(a[1] - b[1])
-    longer = dif.index(max(dif))
-    shorter = [1, 0][longer]
-    if dif[longer]:
-        floater = float(dif[shorter]) / dif[longer]
-    else:
-        return [a, b]
-    for x in range(dif[longer]):
-        point = list(a)
-        point[longer] += (x + 1) * direction_steps[longer]
-        point[shorter] += int(round((x + 1) * floater)) * direction_steps[shorter]
-        path.append(tuple(point))
-    return path
-
-
 def make_stats(default: int = 1, stats: dict[str, int] = None) -> dict[str, int]:
     if stats is None:
         stats = {}
@@ -1,11 +1,13 @@
 from abc import ABC
 from time import sleep
+from typing import Optional
 
 import utils
 from content_types import DescriptionList
 import commands
 from utils import strip_ansi_escape_sequences, left_justify_ansi_multiline
 import config
+from profiling import profiler
 
 
 class Window(ABC):
@@ -23,12 +25,28 @@ class Window(ABC):
         self._border = border
         self._title = title
         self._title_source = title_source
+        self._layout_key: Optional[tuple] = None
+        self._layout: Optional[tuple[dict, tuple[int, int]]] = None
+        self._command_table: Optional[commands.CommandTable] = None
+        self._command_context = None
 
     def _commands(self) -> dict:
         """The mapping of commands&methods specific for the window"""
         return {commands.GetHelp(): self._help_command}
 
     def get_display_data(self) -> tuple[dict, tuple[int, int]]:
+        """Reuse the last layout while the content version and the window geometry are unchanged"""
+        content_version = self._content.version
+        if content_version is None:
+            return self._lay_out()
+        layout_key = (content_version, self.size, self.top_left)
+        if layout_key != self._layout_key:
+            self._layout = self._lay_out()
+            self._layout_key = layout_key
+        return self._layout
+
+    @profiler.timed('render')
+    def _lay_out(self) -> tuple[dict, tuple[int, int]]:
         """Pad the content to size and position, apply borders and hints"""
         content_data = self._content.data().split('\n')
         content_data, left_pad, min_right_pad = left_justify_ansi_multiline(content_data, self.size[-1])
@@ -69,12 +87,20 @@ class Window(ABC):
         return content_data
 
     def _available_commands(self) -> dict:
-        local_commands = self._commands()
-        content_commands = self._content.commands()
-        if set(local_commands) & set(content_commands):
-            raise ValueError(f'Duplicate window command "{set(local_commands) & set(content_commands)}"'
-                             f' in window {self.__class__}')
-        return {**local_commands, **content_commands}
+        return self._get_command_table().commands
+
+    def _get_command_table(self) -> commands.CommandTable:
+        """Rebuild the command table only when the content reports a new command context"""
+        command_context = self._content.command_context()
+        if self._command_table is None or command_context != self._command_context:
+            local_commands = self._commands()
+            content_commands = self._content.commands()
+            if set(local_commands) & set(content_commands):
+                raise ValueError(f'Duplicate window command "{set(local_commands) & set(content_commands)}"'
+                                 f' in window {self.__class__}')
+            self._command_table = commands.CommandTable({**local_commands, **content_commands})
+            self._command_context = command_context
+        return self._command_table
 
     def _help_command(self, _) -> bool:
         help_window = OverlayWindow(size=(15, 50), top_left=(5, 20), ui=self.ui,
@@ -87,23 +113,25 @@ class Window(ABC):
         Process the player command by getting the data and calling one of the UI
         methods
         """
-        for command, callback in self._available_commands().items():
-            if command == player_input:
-                should_game_continue = callback(player_input)
-                if command.changes_window:
-                    self.ui.drop_window(self)
-                elif self.ui.is_top(self):
-                    displayed_content, cursor_pos = self.get_display_data()
-                    result = self.ui.display(displayed_content, cursor_pos)
-                    new_content, new_cursor_pos = self.get_display_data()
-                    while new_content != displayed_content:
-                        sleep(config.frame_viewing_time)
-                        result = self.ui.display(new_content, new_cursor_pos)
-                        displayed_content = new_content
-                        new_content, new_cursor_pos = self.get_display_data()
-                    return result
-                return should_game_continue
-        return True
+        command_and_callback = self._get_command_table().get(player_input)
+        if command_and_callback is None:
+            return True
+        command, callback = command_and_callback
+        should_game_continue = callback(player_input)
+        self._content.touch()
+        if command.changes_window:
+            self.ui.drop_window(self)
+        elif self.ui.is_top(self):
+            displayed_content, cursor_pos = self.get_display_data()
+            result = self.ui.display(displayed_content, cursor_pos)
+            new_content, new_cursor_pos = self.get_display_data()
+            while new_content != displayed_content or self._content.in_flight:
+                sleep(config.frame_viewing_time)
+                result = self.ui.display(new_content, new_cursor_pos)
+                displayed_content = new_content
+                new_content, new_cursor_pos = self.get_display_data()
+            return result
+        return should_game_continue
 
 
 class SelectionWindow(Window):
@@ -148,8 +176,8 @@ class InputWindow(Window):
         self.target(self._content.data())
         return True
 
-    def get_display_data(self) -> tuple[dict, tuple[int, int]]:
-        content_dict, cursor_pos = super().get_display_data()
+    def _lay_out(self) -> tuple[dict, tuple[int, int]]:
+        content_dict, cursor_pos = super()._lay_out()
         cursor_pos = (self.top_left[0] + 1,
                       len(self._content.data()) // 2 + self.top_left[1] + self.size[1] // 2)
         return content_dict, cursor_pos
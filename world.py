@@ -1,12 +1,16 @@
-from typing import Optional, Type
+from typing import Optional, Type, Union
+import collections
 import console
+import functools
 import random
 from game_objects import Terrain, FlavorTerrain, LiquidSource, Item, \
     Creature, Container, HumanoidSpecies, Animal, GameObject, Tile, Species
 import items
 import config
+import lines
+from profiling import profiler
 import species as sp
-from utils import direct_path, coord_distance
+from utils import coord_distance
 
 # Ground fillers
 grass = Terrain(color=console.fg.lightgreen, name='grass',
@@ -174,10 +178,10 @@ class Well(FlavorTerrain):
     size = (3, 3)
     _data = {}
 
-    def new(self, size: tuple[int, int], filler: Terrain) -> dict[tuple[int, int], Terrain]:
+    def new(self, size: tuple[int, int], filler: Terrain, rng: random.Random) -> dict[tuple[int, int], Terrain]:
         self._data = {}
-        top_left = (random.randint(0, size[0] - self.size[0]),
-                    random.randint(0, size[1] - self.size[1]))
+        top_left = (rng.randint(0, size[0] - self.size[0]),
+                    rng.randint(0, size[1] - self.size[1]))
         self._add_rectangle(filler=filler, size=self.size, border_only=True, at_coords=top_left)
         self._data[(top_left[0] + 1, top_left[1] + 1)] = well_terrain
         return self._data
@@ -238,47 +242,154 @@ structures = {
                          config.ORDER_FORCE: [well]}}
 
 
-class Location(Container):
+def generation_rng(seed: str, *coords: tuple[int, int]) -> random.Random:
+    """A random generator that always produces the same world part for the same seed and coordinates"""
+    return random.Random(':'.join([seed] + [f'{y},{x}' for y, x in coords]))
+
+
+def pack_coords(row: int, column: int, width: int) -> int:
+    """One integer key for a cell of a grid that is width cells wide"""
+    return row * width + column
+
+
+def _remember(cache: collections.OrderedDict, key: int, value, limit: int) -> None:
+    """Add to a least recently used cache and drop its oldest entries beyond the limit"""
+    cache[key] = value
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+def pick_location_features(rng: random.Random, forces: dict[str, int], climate: str, main_terrain: Terrain) \
+        -> tuple[str, Optional[FlavorTerrain], Optional[FlavorTerrain]]:
     """
-    Generates the terrain data
-    Keeps the stateless data about the location: terrain, items
-    Provides Line-of-sight information
-    Provides pathfinding
+    The force drawn for the flavor, the flavor terrain and the structure of a location, if it has them
+    They are the first draws of the location's generator, so the maps can show them without generating the location.
     """
+    force_list = list(forces.keys())
+    force_weights = [forces[f] for f in force_list]
+    random_force = rng.choices(force_list, weights=force_weights)[0]
+    available_flavors = [fl for fl in flavor_terrains[climate][random_force] if fl.appears_in(main_terrain, climate)]
+    flavor = rng.choice(available_flavors) if rng.random() > 0.8 and available_flavors else None
+    force = rng.choices(force_list, weights=force_weights)[0]
+    available_structures = [structure for structure in structures[climate][force]
+                            if structure.appears_in(main_terrain, climate)]
+    structure = rng.choice(available_structures) if rng.random() > 0.9 and available_structures else None
+    return random_force, flavor, structure
 
-    def __init__(self, top_left: tuple[int, int] = (0, 0), forces: dict[str, int] = None,
-                 main_terrain: Terrain = None, climate: str = None, region_name: str = None):
+
+def location_map_details(flavor: Optional[FlavorTerrain], structure: Optional[FlavorTerrain]) -> list[str]:
+    local_name = None if structure is None else structure.name
+    flavor_name = None if flavor is None else flavor.name
+    return [f'Landmark: {local_name}', f'Features: {flavor_name}']
+
+
+class NeighborTable(dict):
+    """
+    The neighbors of every cell of a rectangle, keyed by cell
+    Each cell's neighbors are computed the first time they are asked for and the same tuple is returned after that.
+    With a world size, the rectangle and the neighbors wrap around the world edges like movement does.
+    """
+
+    def __init__(self, top_left: tuple[int, int], bottom_right: tuple[int, int],
+                 world_size: Optional[tuple[int, int]] = None):
+        super().__init__()
         self._top_left = top_left
-        self._last_spawn_time = -1 * config.random_creatures_respawn_period
-        self.stored_creatures: list[Creature] = []
-        self._forces = forces
-        self._climate = climate
-        self._terrains: list[Terrain] = []
-        self._terrain_weights: list[float] = []
-        self._region_name = region_name
-        self._filler_terrain = filler_terrains[climate][self._main_force()]
-        self._main_terrain = main_terrain
-        self._flavor: Optional[FlavorTerrain] = None
-        self._flavor_force: Optional[str] = None
-        self._structure: Optional[FlavorTerrain] = None
-        self._structure_terrains = {}
-        self._select_terrains()
-        visual = self._structure or self._flavor or main_terrain
-        self._local_name = None if self._structure is None else self._structure.name
-        if self._local_name:
-            name = ', '.join([self._local_name, self._region_name])
+        self._bottom_right = bottom_right
+        self._world_size = world_size
+
+    def __missing__(self, coords: tuple[int, int]) -> tuple[tuple[int, int], ...]:
+        if self._world_size is None:
+            neighbors = tuple((coords[0] + change_y, coords[1] + change_x)
+                              for change_x in [-1, 0, 1] for change_y in [-1, 0, 1]
+                              if (change_x or change_y)
+                              and self._top_left[0] <= coords[0] + change_y < self._bottom_right[0]
+                              and self._top_left[1] <= coords[1] + change_x < self._bottom_right[1])
         else:
-            name = self._region_name
-        super().__init__(height=config.location_height, width=config.location_width,
-                         icon=visual.raw_icon, color=visual.color, name=name)
-        self._contents: list[list[Tile]] = []
+            (top, left), (bottom, right) = self._top_left, self._bottom_right
+            height, width = self._world_size
+            neighbors = tuple(((coords[0] + change_y) % height, (coords[1] + change_x) % width)
+                              for change_x in [-1, 0, 1] for change_y in [-1, 0, 1]
+                              if (change_x or change_y)
+                              and (coords[0] + change_y - top) % height < bottom - top
+                              and (coords[1] + change_x - left) % width < right - left)
+        self[coords] = neighbors
+        return neighbors
+
 
-    def get_empty_spot_for(self, creature: Creature) -> tuple[int, int]:
-        for row in range(self._height):
-            for column in range(self._width):
-                coords = (row + self._top_left[0], column + self._top_left[1])
-                if creature.can_traverse(self.tile_at(coords)) == '':
-                    return coords
+@functools.lru_cache(maxsize=None)
+def chebyshev_ring(radius: int) -> tuple[tuple[int, int], ...]:
+    """The offsets at exactly the given Chebyshev distance from a cell, row by row"""
+    return tuple((row, column) for row in range(-radius, radius + 1) for column in range(-radius, radius + 1)
+                 if max(abs(row), abs(column)) == radius)
+
+
+@functools.lru_cache(maxsize=config.neighbor_table_cache_size)
+def neighbor_table(top_left: tuple[int, int], bottom_right: tuple[int, int],
+                   world_size: Optional[tuple[int, int]] = None) -> NeighborTable:
+    """The table of a rectangle is shared by the location or active area that covers it and outlives them"""
+    return NeighborTable(top_left, bottom_right, world_size)
+
+
+class Navigation:
+    """
+    A mixin with the movement decisions of creatures and the placement of items on the ground
+    Subclasses provide bounds, tile_at(), passage_cost(), has_free_slot() and _all_neighbors() for their area
+    """
+
+    @property
+    def bounds(self) -> tuple[tuple[int, int], tuple[int, int]]:
+        """The top left cell of the area and the cell past its bottom right"""
+        raise NotImplementedError(f"Class {self.__class__} must implement bounds!")
+
+    def contains_coords(self, coords: tuple[int, int]) -> bool:
+        raise NotImplementedError(f"Class {self.__class__} must implement contains_coords!")
+
+    def wrap_coords(self, coords: tuple[int, int]) -> tuple[int, int]:
+        """The coordinates within the world, for areas that wrap around its edges"""
+        return coords
+
+    def nearest_coords(self, origin: tuple[int, int], coords: tuple[int, int]) -> tuple[int, int]:
+        """The copy of the coordinates nearest to the origin, for areas that wrap around the world edges"""
+        return coords
+
+    def tile_at(self, coords: tuple[int, int]) -> Tile:
+        raise NotImplementedError(f"Class {self.__class__} must implement tile_at!")
+
+    def passage_cost(self, creature: Creature, coords: tuple[int, int]) -> int:
+        raise NotImplementedError(f"Class {self.__class__} must implement passage_cost!")
+
+    def can_traverse(self, creature: Creature, coords: tuple[int, int]) -> bool:
+        return creature.passage_problem(self.passage_cost(creature, coords)) == ''
+
+    def _covering_radius(self, coords: tuple[int, int]) -> int:
+        """The Chebyshev radius around the coordinates that covers the whole area"""
+        (top, left), (bottom, right) = self.bounds
+        return max(coords[0] - top, bottom - 1 - coords[0], coords[1] - left, right - 1 - coords[1])
+
+    def has_free_slot(self, coords: tuple[int, int]) -> bool:
+        raise NotImplementedError(f"Class {self.__class__} must implement has_free_slot!")
+
+    def put_items(self, dropped_items: list[Item], coords: tuple[int, int]) -> list[Item]:
+        """
+        Put the items on the tile and spill the rest over the rings of tiles around it, nearest ring first
+        Returns the items that found no room anywhere in the area. They are left out of the game.
+        """
+        placed = 0
+        for radius in range(self._covering_radius(coords) + 1):
+            for row_offset, column_offset in chebyshev_ring(radius):
+                spot = (coords[0] + row_offset, coords[1] + column_offset)
+                if not self.contains_coords(spot) or not self.has_free_slot(spot):
+                    continue
+                tile = self.tile_at(spot)
+                while placed < len(dropped_items) and self.has_free_slot(spot):
+                    tile.add_item(dropped_items[placed])
+                    placed += 1
+                if placed == len(dropped_items):
+                    return []
+        return dropped_items[placed:]
+
+    def _all_neighbors(self, coords: tuple[int, int]) -> tuple[tuple[int, int], ...]:
+        raise NotImplementedError(f"Class {self.__class__} must implement _all_neighbors!")
 
     def get_goal_step(self, creature: Creature, current_coords: tuple[int, int],
                       goal: str, other_creatures: dict[tuple[int, int], Creature]) -> tuple[int, int]:
@@ -298,6 +409,7 @@ class Location(Container):
                             runner: Creature) -> tuple[int, int]:
         distance = runner.perception_radius
         for hunter_coords, hunter in other_creatures.items():
+            hunter_coords = self.nearest_coords(coords, hunter_coords)
             if isinstance(hunter.species, HumanoidSpecies) and coord_distance(coords, hunter_coords) <= distance:
                 good_y_direction = [1, -1][hunter_coords[0] > coords[0]]
                 good_x_direction = [1, -1][hunter_coords[1] > coords[1]]
@@ -307,8 +419,8 @@ class Location(Container):
                               ]
                 for step in safe_steps:
                     try:
-                        if runner.can_traverse(self.tile_at(step)) == '':
-                            return step
+                        if self.can_traverse(runner, step):
+                            return self.wrap_coords(step)
                     except ValueError:
                         pass
         return coords
@@ -319,36 +431,211 @@ class Location(Container):
                    target_type: Type[Species]) -> tuple[int, int]:
         distance = hunter.perception_radius
         for prey_coords, prey in other_creatures.items():
+            prey_coords = self.nearest_coords(coords, prey_coords)
             if isinstance(prey.species, target_type) and coord_distance(coords, prey_coords) < distance:
-                path = direct_path(coords, prey_coords)
-                if hunter.can_traverse(self.tile_at(path[1])) == '' or len(path) == 2:
-                    return path[1]
+                step = lines.first_step(coords, prey_coords)
+                if self.can_traverse(hunter, step) or step == prey_coords:
+                    return self.wrap_coords(step)
         return coords
 
-    def _all_neighbors(self, coords: tuple[int, int]) -> list[tuple[int, int]]:
-        neighbors = []
-        for change_x in [-1, 0, 1]:
-            for change_y in [-1, 0, 1]:
-                new_y = coords[0] + change_y
-                new_x = coords[1] + change_x
-                if new_x < self._top_left[1] or new_y < self._top_left[0] \
-                        or new_x >= self._width + self._top_left[1] \
-                        or new_y >= self._height + self._top_left[0] \
-                        or (new_y, new_x) == coords:
-                    continue
-                neighbors.append((new_y, new_x))
-        return neighbors
-
     def _choose_random_passable_neighbor(self, creature: Creature,
                                          coords: tuple[int, int]) -> tuple[int, int]:
         neighbors = self._all_neighbors(coords)
-        random.shuffle(neighbors)
-        for new_coords in neighbors:
-            if creature.can_traverse(self.tile_at(new_coords)) == '':
+        for new_coords in random.sample(neighbors, len(neighbors)):
+            if self.can_traverse(creature, new_coords):
                 return new_coords
         else:
             return coords
 
+
+class Location(Container, Navigation):
+    """
+    Generates the terrain data
+    Keeps the stateless data about the location: terrain, items
+    Provides Line-of-sight information
+    Provides pathfinding
+    """
+
+    def __init__(self, top_left: tuple[int, int] = (0, 0), forces: dict[str, int] = None,
+                 main_terrain: Terrain = None, climate: str = None, region_name: str = None,
+                 seed: str = ''):
+        self._top_left = top_left
+        self._seed = seed
+        self._modified_tiles: dict[tuple[int, int], Tile] = {}
+        # The kind of passage of each tile and, per traversal profile, the final cost of each kind and of each tile
+        self._passage_kinds: list[list[tuple[str, int]]] = []
+        self._passage_kind_set: set[tuple[str, int]] = set()
+        self._passage_grids: dict[tuple, tuple[dict[tuple[str, int], int], list[list[int]]]] = {}
+        # The cells of each set of passable kinds, indexed when a creature that can pass those kinds asks for them
+        self._passable_index: dict[frozenset[tuple[str, int]], set[tuple[int, int]]] = {}
+        # The tiles without a free slot for an item, indexed on the first spill
+        self._full_tiles: Optional[set[tuple[int, int]]] = None
+        self._last_spawn_time = -1 * config.random_creatures_respawn_period
+        self.stored_creatures: list[Creature] = []
+        # The turn up to which the stored creatures were simulated, None if nothing was ever stored
+        self.last_simulated_turn: Optional[int] = None
+        self._forces = forces
+        self._climate = climate
+        self._terrains: list[Terrain] = []
+        self._terrain_weights: list[float] = []
+        self._region_name = region_name
+        self._filler_terrain = filler_terrains[climate][self._main_force()]
+        self._main_terrain = main_terrain
+        self._flavor: Optional[FlavorTerrain] = None
+        self._flavor_force: Optional[str] = None
+        self._structure: Optional[FlavorTerrain] = None
+        self._structure_terrains = {}
+        self._select_terrains(generation_rng(seed, top_left))
+        visual = self._structure or self._flavor or main_terrain
+        self._local_name = None if self._structure is None else self._structure.name
+        if self._local_name:
+            name = ', '.join([self._local_name, self._region_name])
+        else:
+            name = self._region_name
+        super().__init__(height=config.location_height, width=config.location_width,
+                         icon=visual.raw_icon, color=visual.color, name=name)
+        self._contents: list[list[Tile]] = []
+
+    @property
+    def top_left(self) -> tuple[int, int]:
+        return self._top_left
+
+    @property
+    def bounds(self) -> tuple[tuple[int, int], tuple[int, int]]:
+        return self._top_left, (self._top_left[0] + self._height, self._top_left[1] + self._width)
+
+    def tile_changed(self, tile: Tile) -> None:
+        """Called by the tiles of the location when their terrain or items change"""
+        self._modified_tiles[tile.coords] = tile
+        if self._passage_kinds:
+            self._update_passage_grids(tile)
+        if self._full_tiles is not None:
+            if tile.has_space():
+                self._full_tiles.discard(tile.coords)
+            else:
+                self._full_tiles.add(tile.coords)
+
+    def has_free_slot(self, coords: tuple[int, int]) -> bool:
+        if self._full_tiles is None:
+            self._full_tiles = {coords for coords in self._all_coords() if not self.tile_at(coords).has_space()}
+        return coords not in self._full_tiles
+
+    def _update_passage_grids(self, tile: Tile) -> None:
+        row, column = self._local_coords(tile.coords)
+        passage = tile.passage_cost
+        if passage == self._passage_kinds[row][column]:
+            return
+        self._passage_kinds[row][column] = passage
+        if passage not in self._passage_kind_set:
+            # The passable kinds of the indexed creatures did not take the new kind into account
+            self._passage_kind_set.add(passage)
+            self._passable_index.clear()
+        for passable_kinds, cells in self._passable_index.items():
+            if passage in passable_kinds:
+                cells.add(tile.coords)
+            else:
+                cells.discard(tile.coords)
+        for profile, (final_costs, grid) in list(self._passage_grids.items()):
+            if passage in final_costs:
+                grid[row][column] = final_costs[passage]
+            else:
+                # A kind of passage that the profile has not paid yet, the grid is rebuilt when it is needed
+                del self._passage_grids[profile]
+
+    def passage_cost(self, creature: Creature, coords: tuple[int, int]) -> int:
+        """The final cost of entering the tile, looked up in the grid of the creature's traversal profile"""
+        if not self.contains_coords(coords):
+            raise ValueError(f'Bad coordinates {coords} for Location passage cost!')
+        grid = self._passage_grid(creature)
+        if grid is None:
+            return creature.passage_cost(self.tile_at(coords))
+        row, column = self._local_coords(coords)
+        return grid[row][column]
+
+    def _passage_grid(self, creature: Creature) -> Optional[list[list[int]]]:
+        profile = creature.traversal_profile
+        if profile is None:
+            return None
+        if profile not in self._passage_grids:
+            self._index_passage_kinds()
+            final_costs = {passage: creature.get_final_effect_size(*passage) for passage in self._passage_kind_set}
+            self._passage_grids[profile] = (final_costs, [[final_costs[passage] for passage in row]
+                                                          for row in self._passage_kinds])
+        return self._passage_grids[profile][1]
+
+    def _index_passage_kinds(self) -> None:
+        if not self._passage_kinds:
+            self._passage_kinds = [[tile.passage_cost for tile in row] for row in self.contents]
+            self._passage_kind_set = set().union(*self._passage_kinds)
+
+    def _passable_kinds(self, creature: Creature) -> frozenset[tuple[str, int]]:
+        """The kinds of passage in the location that the creature can pay with its current energy"""
+        self._index_passage_kinds()
+        profile = creature.traversal_profile
+        final_costs = self._passage_grids[profile][0] if profile in self._passage_grids else {}
+        limit = min(creature.energy, creature.max_energy)
+        return frozenset(passage for passage in self._passage_kind_set
+                         if (final_costs[passage] if passage in final_costs
+                             else creature.get_final_effect_size(*passage)) <= limit)
+
+    def _passable_cells_of(self, passable_kinds: frozenset[tuple[str, int]]) -> set[tuple[int, int]]:
+        """The indexed cells of the passable kinds, not to be modified"""
+        if passable_kinds not in self._passable_index:
+            top, left = self._top_left
+            self._passable_index[passable_kinds] = {(top + row, left + column)
+                                                    for row, passages in enumerate(self._passage_kinds)
+                                                    for column, passage in enumerate(passages)
+                                                    if passage in passable_kinds}
+        return self._passable_index[passable_kinds]
+
+    def get_empty_spot_for(self, creature: Creature, near: tuple[int, int] = None,
+                           occupied: dict[tuple[int, int], Creature] = None) -> Optional[tuple[int, int]]:
+        """The unoccupied cell nearest to near that the creature can enter, near the top left corner by default"""
+        cells = self._passable_cells_of(self._passable_kinds(creature))
+        occupied = occupied or {}
+        near = near or self._top_left
+        if len(cells) < self._height * self._width // 16:
+            # The rings would mostly go over impassable cells, comparing the few passable ones is cheaper
+            free_cells = [cell for cell in cells if cell not in occupied]
+            return min(free_cells, key=lambda cell: (coord_distance(cell, near), cell)) if free_cells else None
+        for radius in range(self._covering_radius(near) + 1):
+            for row_offset, column_offset in chebyshev_ring(radius):
+                spot = (near[0] + row_offset, near[1] + column_offset)
+                if spot in cells and spot not in occupied:
+                    return spot
+        return None
+
+    def _all_coords(self) -> list[tuple[int, int]]:
+        return [(row + self._top_left[0], column + self._top_left[1])
+                for row in range(self._height) for column in range(self._width)]
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._modified_tiles or self.stored_creatures
+                    or self._last_spawn_time != -1 * config.random_creatures_respawn_period)
+
+    def export_changes(self) -> dict:
+        """Everything that differs from the freshly generated location"""
+        return {'tiles': {coords: tile.__getstate__() for coords, tile in self._modified_tiles.items()},
+                'stored_creatures': self.stored_creatures,
+                'last_simulated_turn': self.last_simulated_turn,
+                'last_spawn_time': self._last_spawn_time}
+
+    def import_changes(self, changes: dict) -> None:
+        """Reapply the output of export_changes() to the regenerated location"""
+        for coords, tile_state in changes['tiles'].items():
+            tile = self.tile_at(coords)
+            tile.__dict__.update(tile_state)
+            self._modified_tiles[coords] = tile
+        self.stored_creatures = changes['stored_creatures']
+        self.last_simulated_turn = changes['last_simulated_turn']
+        self._last_spawn_time = changes['last_spawn_time']
+
+    def _all_neighbors(self, coords: tuple[int, int]) -> tuple[tuple[int, int], ...]:
+        if not self.contains_coords(coords):
+            raise ValueError(f'Bad coordinates {coords} for Location neighbors!')
+        return neighbor_table(*self.bounds)[coords]
+
     def get_items_data_at(self, coords: tuple[int, int]) -> str:
         return self.tile_at(coords).data()
 
@@ -357,58 +644,93 @@ class Location(Container):
 
     @property
     def map_details(self) -> list[str]:
-        flavor_name = None if self._flavor is None else self._flavor.name
-        return [f'Landmark: {self._local_name}', f'Features: {flavor_name}']
+        return location_map_details(self._flavor, self._structure)
 
-    def load_creatures(self, local_creatures: dict[tuple[int, int], Creature],
-                       current_turn: int) -> dict[tuple[int, int], Creature]:
+    def store_creatures(self, creatures: list[Creature], current_turn: int) -> None:
+        """Keep the creatures of the location while the character is away"""
+        self.stored_creatures = creatures
+        self.last_simulated_turn = current_turn
+
+    def respawn_is_due(self, current_turn: int) -> bool:
+        return current_turn - self._last_spawn_time >= config.random_creatures_respawn_period
+
+    def top_up_creatures(self, creatures: list[Creature], current_turn: int) -> list[Creature]:
+        """When a respawn is due, new creatures top the population up instead of replacing those that live here"""
+        if not self.respawn_is_due(current_turn):
+            return creatures
+        return creatures + self.spawn_creatures(current_turn)[len(creatures):]
+
+    def spawn_creatures(self, current_turn: int) -> list[Creature]:
         # TODO: Get respawning creatures from the flavor/structure
         # TODO: Get non-respawning creatures from the structure
-        if current_turn - self._last_spawn_time < config.random_creatures_respawn_period:
-            additional_creatures = self.stored_creatures[:]
-        else:
-            additional_creatures = []
-            self._last_spawn_time = current_turn
-            species_lists = [t.spawned_creatures for t in self._terrains]
-            weights = self._terrain_weights[:]
-            for creature_count in range(int(sum(weights) // 20)):
-                species_list = random.choices(species_lists, weights=weights)[0]
-                if not species_list:
-                    continue
-                if len(species_list) > len(config.creature_rarity_scale):
-                    raise ValueError(f'Creature rarity scale is not long enough for'
-                                     f' list of length {len(species_list)}!')
-                chosen_weights = config.creature_rarity_scale[:len(species_list)]
-                chosen_creature_species = random.choices(species_list, chosen_weights)[0]
-                additional_creatures.append(Animal(chosen_creature_species))
-        for creature_instance in additional_creatures:
-            new_coords = self._random_coords()
-            while new_coords in local_creatures or creature_instance.can_traverse(self.tile_at(new_coords)) != '':
-                new_coords = self._random_coords()
-            local_creatures[new_coords] = creature_instance
+        new_creatures = []
+        self._last_spawn_time = current_turn
+        species_lists = [t.spawned_creatures for t in self._terrains]
+        weights = self._terrain_weights[:]
+        for creature_count in range(int(sum(weights) // 20)):
+            species_list = random.choices(species_lists, weights=weights)[0]
+            if not species_list:
+                continue
+            if len(species_list) > len(config.creature_rarity_scale):
+                raise ValueError(f'Creature rarity scale is not long enough for'
+                                 f' list of length {len(species_list)}!')
+            chosen_weights = config.creature_rarity_scale[:len(species_list)]
+            chosen_creature_species = random.choices(species_list, chosen_weights)[0]
+            new_creatures.append(Animal(chosen_creature_species))
+        return new_creatures
+
+    def load_creatures(self, local_creatures: dict[tuple[int, int], Creature],
+                       current_turn: int) -> dict[tuple[int, int], Creature]:
+        # Catch up on the turns that the off-screen simulation did not cover
+        if self.last_simulated_turn is not None and current_turn > self.last_simulated_turn:
+            for creature_instance in self.stored_creatures:
+                creature_instance.live_offscreen(current_turn - self.last_simulated_turn)
+        additional_creatures = self.top_up_creatures([c for c in self.stored_creatures if not c.is_dead],
+                                                     current_turn)
+        # The placed creatures are in the game now, until the location stores them again.
+        # Those that found no room stay stored, with everything they carry.
+        self.stored_creatures = self._place_creatures(additional_creatures, local_creatures)
         return local_creatures
 
-    def _random_coords(self):
-        return random.randint(self._top_left[0], self._top_left[0] + self._height - 1), \
-            random.randint(self._top_left[1], self._top_left[1] + self._width - 1)
+    def _place_creatures(self, creatures: list[Creature],
+                         local_creatures: dict[tuple[int, int], Creature]) -> list[Creature]:
+        """
+        Put each creature on a random free cell that it can enter, drawing the cells without replacement
+        Creatures that can enter the same kinds of passage share their cells, so placing every creature
+        takes at most one draw per passable cell. Returns the creatures that fit nowhere in the location.
+        """
+        unplaced = []
+        undrawn_cells: dict[frozenset, list[tuple[int, int]]] = {}
+        for creature in creatures:
+            passable_kinds = self._passable_kinds(creature)
+            if passable_kinds not in undrawn_cells:
+                undrawn_cells[passable_kinds] = list(self._passable_cells_of(passable_kinds))
+            cells = undrawn_cells[passable_kinds]
+            while cells:
+                index = random.randrange(len(cells))
+                coords = cells[index]
+                cells[index] = cells[-1]
+                cells.pop()
+                if coords not in local_creatures:
+                    local_creatures[coords] = creature
+                    break
+            else:
+                unplaced.append(creature)
+        return unplaced
 
     def _main_force(self) -> str:
         rev_forces = {v: k for k, v in self._forces.items()}
         return rev_forces[max(rev_forces)]
 
-    def _select_terrains(self) -> None:
+    def _select_terrains(self, rng: random.Random) -> None:
         max_base_terrain = 40
         max_flavor_terrain = 3
         base_weight = max_base_terrain * self._forces[self._main_force()] / 100
         # Add a flavor terrain
-        forces = list(self._forces.keys())
-        force_weights = [self._forces[f] for f in forces]
-        random_force = random.choices(forces, weights=force_weights)[0]
-        available_flavors = [fl for fl in flavor_terrains[self._climate][random_force]
-                             if fl.appears_in(self._main_terrain, self._climate)]
-        if random.random() > 0.8 and available_flavors:
-            flavor = random.choice(available_flavors)
-            self._flavor = flavor
+        random_force, self._flavor, self._structure = pick_location_features(rng, self._forces, self._climate,
+                                                                             self._main_terrain)
+        if self._flavor is not None:
+            flavor = self._flavor
             self._flavor_force = random_force
         else:
             flavor = self._main_terrain
@@ -419,24 +741,27 @@ class Location(Container):
         self._terrains = [self._filler_terrain, self._main_terrain, flavor]
         self._terrain_weights = [filler_weight, base_weight, flavor_weight]
         # Add a structure
-        force = random.choices(forces, weights=force_weights)[0]
-        available_structures = [structure for structure in structures[self._climate][force]
-                                if structure.appears_in(self._main_terrain, self._climate)]
-        if random.random() > 0.9 and available_structures:
-            self._structure = random.choice(available_structures)
+        if self._structure is not None:
             self._structure_terrains = self._structure.new((config.location_height, config.location_width),
-                                                           self._filler_terrain)
+                                                           self._filler_terrain, rng)
 
     def _data_prep(self) -> None:
         if not self._contents:
-            for row_index in range(self._height):
-                row = []
-                for column_index in range(self._width):
-                    terrain = self._structure_terrains.get((row_index, column_index),
-                                                           random.choices(self._terrains,
-                                                                          weights=self._terrain_weights)[0])
-                    row.append(Tile(terrain=terrain))
-                self._contents.append(row[:])
+            self._generate_tiles()
+
+    @profiler.timed('location_terrain')
+    def _generate_tiles(self) -> None:
+        rng = generation_rng(self._seed, self._top_left, (0, 0))
+        for row_index in range(self._height):
+            row = []
+            for column_index in range(self._width):
+                terrain = self._structure_terrains.get((row_index, column_index),
+                                                       rng.choices(self._terrains,
+                                                                   weights=self._terrain_weights)[0])
+                row.append(Tile(terrain=terrain,
+                                coords=(row_index + self._top_left[0], column_index + self._top_left[1]),
+                                listener=self))
+            self._contents.append(row[:])
 
     @property
     def contents(self) -> list[list[Tile]]:
@@ -461,49 +786,32 @@ class Location(Container):
                             target_to: tuple[int, int] = None) -> str:
         rows = [[c.icon for c in row]
                 for row in self.contents]
+        # Creatures and target paths can be outside the location, in the active area around it
         for coords, creature in creatures.items():
-            local_coords = self._local_coords(coords)
-            rows[local_coords[0]][local_coords[1]] = creature.icon
+            if self.contains_coords(coords):
+                local_coords = self._local_coords(coords)
+                rows[local_coords[0]][local_coords[1]] = creature.icon
         if target_from and target_to:
-            path = direct_path(target_from, target_to)[1:]
+            path = lines.direct_path(target_from, target_to, supercover=True)[1:]
             for coords in path:
-                icon = config.target_cross_icon if coords == path[-1] else config.target_path_icon
-                local_coords = self._local_coords(coords)
-                rows[local_coords[0]][local_coords[1]] = icon
+                if self.contains_coords(coords):
+                    icon = config.target_cross_icon if coords == path[-1] else config.target_path_icon
+                    local_coords = self._local_coords(coords)
+                    rows[local_coords[0]][local_coords[1]] = icon
         rows = [''.join(row) for row in rows]
         return '\n'.join(rows)
 
     def items_at(self, coords: tuple[int, int]) -> list[Item]:
         return self.tile_at(coords).item_list
 
-    def put_item(self, item: Item, coords: tuple[int, int]) -> None:
-        tile = self.tile_at(coords)
-        if tile.has_space():
-            tile.add_item(item)
-        else:
-            tile_list = [coords]
-            current_index = 0
-            while True:
-                neighbors = []
-                while current_index < len(tile_list):
-                    neighbors += self._all_neighbors(tile_list[current_index])
-                    current_index += 1
-                new_neighbors = list(set(neighbors) - set(tile_list))
-                for neighbor in new_neighbors:
-                    new_tile = self.tile_at(neighbor)
-                    if new_tile.has_space():
-                        new_tile.add_item(item)
-                        return
-                    else:
-                        tile_list.append(neighbor)
-                if not new_neighbors:
-                    break
-            raise NotImplementedError(f'Implement Overflow achievement here!')
-
 
 # TODO: PoI selection and randomization
 # TODO: Init the locations with the PoI/force/base terrains (handles gradients)
 class Region(Container):
+    """
+    The name, main force, climate and main terrain of a square of locations
+    Regions are cheap summaries that generate their locations, the world keeps the locations.
+    """
     height_in_tiles = config.region_size * config.location_height
     width_in_tiles = config.region_size * config.location_width
     region_names = {config.COLD_CLIMATE: {snow: 'Frost lands',
@@ -526,15 +834,26 @@ class Region(Container):
                                          salt_lake: 'Chott',
                                          rocks: 'Crag'}}
 
-    def __init__(self, top_left: tuple[int, int], main_force: str, climate: str, suffix: str = ' of tests'):
+    def __init__(self, top_left: tuple[int, int], main_force: str, climate: str, suffix: str = ' of tests',
+                 seed: str = '', main_terrain: Terrain = None):
         self._top_left = top_left
         self._main_force = main_force
         self._climate = climate
-        self._main_terrain: Terrain = random.choice(base_force_terrains[self._climate][self._main_force])
+        self._seed = seed
+        if main_terrain is None:
+            main_terrain = generation_rng(seed, top_left).choice(base_force_terrains[climate][main_force])
+        self._main_terrain: Terrain = main_terrain
         raw_name = f'{Region.region_names[self._climate][self._main_terrain]} {suffix}'
         name = f'{config.force_colors[self._main_force]}{raw_name}{console.fx.end}'
         super().__init__(height=config.region_size, width=config.region_size,
                          name=name, icon=self._main_terrain.raw_icon, color=self._main_terrain.color)
+        # The flavor and structure of each location, which the region map shows without generating the locations
+        self._location_features: list[list[tuple[Optional[FlavorTerrain], Optional[FlavorTerrain]]]] = [
+            [pick_location_features(generation_rng(seed, self.get_location_top_left(row, column)),
+                                    self._calculate_forces(row, column), climate, self._main_terrain)[1:]
+             for column in range(self._width)] for row in range(self._height)]
+        self._contents = [[structure or flavor or self._main_terrain for flavor, structure in row]
+                          for row in self._location_features]
 
     @property
     def map_details(self) -> list[str]:
@@ -542,22 +861,39 @@ class Region(Container):
         colored_climate = config.climate_colors[self._climate] + self._climate + console.fx.end
         return [f'Region: {self.name}', f'Force: {colored_force}', f'Climate: {colored_climate}']
 
-    def _data_prep(self) -> None:
-        if not self._contents[0]:
-            self._generate_locations()
+    def location_map_details(self, row: int, column: int) -> list[str]:
+        return location_map_details(*self._location_features[row][column])
 
-    @property
-    def contents(self) -> list[list[Location]]:
-        self._data_prep()
-        return self._contents
+    def location_icon(self, row: int, column: int, blinking: bool = False) -> str:
+        visual = self._contents[row][column]
+        return visual.blinking_icon if blinking else visual.icon
 
-    def _generate_locations(self) -> None:
-        self._contents = [[Location(top_left=self._get_location_top_left(row, column),
-                                    forces=self._calculate_forces(row, column),
-                                    main_terrain=self._main_terrain,
-                                    climate=self._climate,
-                                    region_name=self.name)
-                           for column in range(self._width)] for row in range(self._height)]
+    def map_rows(self, character_at: tuple[int, int] = None) -> list[list[str]]:
+        """The icons of the locations, with the character at its absolute coordinates if it is in the region"""
+        rows = [[visual.icon for visual in row] for row in self._contents]
+        if character_at is not None:
+            character_position = self._get_location_coords_from_absolute_coords(character_at)
+            if -1 < character_position[0] < config.region_size \
+                    and -1 < character_position[1] < config.region_size:
+                rows[character_position[0]][character_position[1]] = '@'
+        return rows
+
+    def data(self, blink_at: tuple[int, int] = None, character_at: tuple[int, int] = None) -> str:
+        rows = self.map_rows(character_at)
+        if blink_at is not None and rows[blink_at[0]][blink_at[1]] != '@':
+            rows[blink_at[0]][blink_at[1]] = self.location_icon(*blink_at, blinking=True)
+        rows = [''.join(row) for row in rows]
+        return '\n'.join(rows)
+
+    def new_location(self, coords: tuple[int, int]) -> Location:
+        """Generate the location at the absolute coordinates, the world keeps it"""
+        row, column = self._get_location_coords_from_absolute_coords(coords)
+        return Location(top_left=self.get_location_top_left(row, column),
+                        forces=self._calculate_forces(row, column),
+                        main_terrain=self._main_terrain,
+                        climate=self._climate,
+                        region_name=self.name,
+                        seed=self._seed)
 
     def _calculate_forces(self, row: int, column: int) -> dict[str, int]:
         forces = {config.NATURE_FORCE: 33, config.CHAOS_FORCE: 33, config.ORDER_FORCE: 33}
@@ -575,7 +911,7 @@ class Region(Container):
                 forces[force] -= adjustment // 2
         return forces
 
-    def _get_location_top_left(self, row: int, column: int) -> tuple[int, int]:
+    def get_location_top_left(self, row: int, column: int) -> tuple[int, int]:
         location_top_left_row = self._top_left[0] + row * config.location_height
         location_top_left_column = self._top_left[1] + column * config.location_width
         return location_top_left_row, location_top_left_column
@@ -587,23 +923,6 @@ class Region(Container):
         location_column = local_column_in_tiles // config.location_width
         return location_row, location_column
 
-    def get_location(self, coords: tuple[int, int]) -> Location:
-        row, column = self._get_location_coords_from_absolute_coords(coords)
-        return self.contents[row][column]
-
-    def data(self, blink_at: tuple[int, int] = None, character_at: tuple[int, int] = None) -> str:
-        rows = [[c.icon for c in row]
-                for row in self.contents]
-        if blink_at is not None:
-            rows[blink_at[0]][blink_at[1]] = self.contents[blink_at[0]][blink_at[1]].blinking_icon
-        if character_at is not None:
-            character_position = self._get_location_coords_from_absolute_coords(character_at)
-            if -1 < character_position[0] < config.region_size \
-                    and -1 < character_position[1] < config.region_size:
-                rows[character_position[0]][character_position[1]] = '@'
-        rows = [''.join(row) for row in rows]
-        return '\n'.join(rows)
-
 
 class World(Container):
     chaos_suffixes = """of Blood
@@ -692,27 +1011,19 @@ of Whispers
 of Wings
 of the Wolf""".split('\n')
 
-    def __init__(self):
+    def __init__(self, seed: Optional[Union[int, str]] = None):
         super().__init__(height=config.world_size, width=config.world_size)
-        forces = [config.NATURE_FORCE, config.ORDER_FORCE, config.CHAOS_FORCE] * (config.world_size ** 2 // 3 + 1)
-        random.shuffle(forces)
-        self._contents: Optional[list[list[Region]]] = []
-        suffixes = {config.ORDER_FORCE: World.order_suffixes[:],
-                    config.NATURE_FORCE: World.nature_suffixes[:],
-                    config.CHAOS_FORCE: World.chaos_suffixes[:]}
-        for f in suffixes:
-            random.shuffle(suffixes[f])
-        for row in range(self._height):
-            region_list = []
-            for column in range(self._width):
-                main_force = forces.pop()
-                climate = random.choice([config.COLD_CLIMATE, config.TEMPERATE_CLIMATE, config.HOT_CLIMATE])
-                suffix = suffixes[main_force].pop()
-                region_list.append(Region(top_left=self._get_region_top_left(row, column),
-                                          main_force=main_force,
-                                          climate=climate,
-                                          suffix=suffix))
-            self._contents.append(region_list[:])
+        # The seed regenerates the same world on load, so that saved games only store what changed.
+        # Any int or str works, its text is hashed by generation_rng, and None picks a random int.
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        # Saved changes of locations that were not visited since loading, applied on the first visit.
+        # The values have a load() method that returns the Location.export_changes() output.
+        self.unloaded_changes: dict[tuple[int, int], object] = {}
+        # Everything is keyed by packed grid coordinates and generated on first access.
+        # The locations are kept until trim_locations(), the region summaries and blocks are forgotten on their own.
+        self._locations: collections.OrderedDict[int, Location] = collections.OrderedDict()
+        self._regions: collections.OrderedDict[int, Region] = collections.OrderedDict()
+        self._region_blocks: collections.OrderedDict[int, list[tuple[str, str, str]]] = collections.OrderedDict()
 
     @staticmethod
     def _get_region_top_left(row: int, column: int) -> tuple[int, int]:
@@ -724,28 +1035,212 @@ of the Wolf""".split('\n')
     def _get_region_coords_from_absolute_coords(coords: tuple[int, int]) -> tuple[int, int]:
         return coords[0] // Region.height_in_tiles, coords[1] // Region.width_in_tiles
 
+    @staticmethod
+    def _location_key(coords: tuple[int, int]) -> int:
+        return pack_coords(coords[0] // config.location_height, coords[1] // config.location_width,
+                           config.world_size * config.region_size)
+
+    def _region_block(self, block_row: int, block_column: int) -> list[tuple[str, str, str, Terrain]]:
+        """
+        The main force, climate, suffix and main terrain of each region of a block, row by row
+        Each block balances its forces and does not repeat a suffix until it runs out of them.
+        The main terrains are what the world map shows.
+        """
+        key = pack_coords(block_row, block_column, config.world_size)
+        if key in self._region_blocks:
+            self._region_blocks.move_to_end(key)
+            return self._region_blocks[key]
+        rng = generation_rng(str(self.seed), (block_row, block_column))
+        block_size = config.region_block_size
+        forces = [config.NATURE_FORCE, config.ORDER_FORCE, config.CHAOS_FORCE] * (block_size ** 2 // 3 + 1)
+        rng.shuffle(forces)
+        all_suffixes = {config.ORDER_FORCE: World.order_suffixes,
+                        config.NATURE_FORCE: World.nature_suffixes,
+                        config.CHAOS_FORCE: World.chaos_suffixes}
+        suffixes = {force: force_suffixes[:] for force, force_suffixes in all_suffixes.items()}
+        for f in suffixes:
+            rng.shuffle(suffixes[f])
+        block = []
+        for _ in range(block_size ** 2):
+            main_force = forces.pop()
+            climate = rng.choice([config.COLD_CLIMATE, config.TEMPERATE_CLIMATE, config.HOT_CLIMATE])
+            if not suffixes[main_force]:
+                suffixes[main_force] = all_suffixes[main_force][:]
+                rng.shuffle(suffixes[main_force])
+            main_terrain = rng.choice(base_force_terrains[climate][main_force])
+            block.append((main_force, climate, suffixes[main_force].pop(), main_terrain))
+        _remember(self._region_blocks, key, block, config.cached_region_limit // block_size ** 2 + 1)
+        return block
+
+    def _region_description(self, row: int, column: int) -> tuple[str, str, str, Terrain]:
+        block_size = config.region_block_size
+        block = self._region_block(row // block_size, column // block_size)
+        return block[row % block_size * block_size + column % block_size]
+
+    def get_region(self, row: int, column: int) -> Region:
+        key = pack_coords(row, column, config.world_size)
+        if key in self._regions:
+            self._regions.move_to_end(key)
+            return self._regions[key]
+        main_force, climate, suffix, main_terrain = self._region_description(row, column)
+        region = Region(top_left=self._get_region_top_left(row, column),
+                        main_force=main_force,
+                        climate=climate,
+                        suffix=suffix,
+                        seed=str(self.seed),
+                        main_terrain=main_terrain)
+        _remember(self._regions, key, region, config.cached_region_limit)
+        return region
+
     def get_location(self, coords: tuple[int, int]) -> Location:
-        row, column = self._get_region_coords_from_absolute_coords(coords)
-        region = self.contents[row][column]
-        return region.get_location(coords)
+        key = self._location_key(coords)
+        location = self._locations.get(key)
+        if location is None:
+            with profiler.timer('location_generation'):
+                region = self.get_region(*self._get_region_coords_from_absolute_coords(coords))
+                location = region.new_location(coords)
+            profiler.count('generated_locations')
+            self._locations[key] = location
+        else:
+            self._locations.move_to_end(key)
+        if location.top_left in self.unloaded_changes:
+            with profiler.timer('location_unpacking'):
+                location.import_changes(self.unloaded_changes.pop(location.top_left).load())
+        return location
 
-    @property
-    def contents(self) -> list[list[Region]]:
-        self._data_prep()
-        return self._contents
+    def generated_locations(self) -> list[Location]:
+        return list(self._locations.values())
+
+    def get_loaded_location(self, coords: tuple[int, int]) -> Optional[Location]:
+        """The location at the coordinates if it is in memory already, without generating or unpacking it"""
+        location = self._locations.get(self._location_key(coords))
+        if location is None or location.top_left in self.unloaded_changes:
+            return None
+        return location
+
+    def trim_locations(self, keep: set[tuple[int, int]]) -> list[Location]:
+        """
+        Forget the least recently used locations beyond config.loaded_location_limit and return them
+        The locations whose top lefts are kept stay, whatever their age. The caller stores the changes
+        of the returned locations in unloaded_changes, or they are lost.
+        """
+        trimmed = []
+        for key in list(self._locations):
+            if len(self._locations) <= config.loaded_location_limit:
+                break
+            if self._locations[key].top_left not in keep:
+                trimmed.append(self._locations.pop(key))
+        return trimmed
 
     @property
     def size(self) -> tuple[int, int]:
         return config.world_size * config.region_size * config.location_height, \
                config.world_size * config.region_size * config.location_width
 
-    def data(self, blink_at: tuple[int, int] = None, character_at: tuple[int, int] = None) -> str:
-        rows = [[c.icon for c in row]
-                for row in self.contents]
-        if blink_at is not None:
-            rows[blink_at[0]][blink_at[1]] = self.contents[blink_at[0]][blink_at[1]].blinking_icon
+    @staticmethod
+    def map_view_top_left(center: tuple[int, int]) -> tuple[int, int]:
+        """The region at the top left of the world map, which shows as much of the world as fits around the center"""
+        height = min(config.world_map_height, config.world_size)
+        width = min(config.world_map_width, config.world_size)
+        return (min(max(0, center[0] - height // 2), config.world_size - height),
+                min(max(0, center[1] - width // 2), config.world_size - width))
+
+    def region_icon(self, row: int, column: int, blinking: bool = False) -> str:
+        main_terrain = self._region_description(row, column)[3]
+        return main_terrain.blinking_icon if blinking else main_terrain.icon
+
+    def map_rows(self, top_left: tuple[int, int], character_at: tuple[int, int] = None) -> list[list[str]]:
+        """The icons of the regions in the world map view from the top left, with the character if it is in view"""
+        top, left = top_left
+        rows = [[self.region_icon(row, column)
+                 for column in range(left, left + min(config.world_map_width, config.world_size))]
+                for row in range(top, top + min(config.world_map_height, config.world_size))]
         if character_at is not None:
             character_position = self._get_region_coords_from_absolute_coords(character_at)
-            rows[character_position[0]][character_position[1]] = '@'
+            if 0 <= character_position[0] - top < len(rows) and 0 <= character_position[1] - left < len(rows[0]):
+                rows[character_position[0] - top][character_position[1] - left] = '@'
+        return rows
+
+    def data(self, blink_at: tuple[int, int] = None, character_at: tuple[int, int] = None) -> str:
+        """The world map around the blinking region, drawn from the region summaries"""
+        top, left = self.map_view_top_left(blink_at or (0, 0))
+        rows = self.map_rows((top, left), character_at)
+        if blink_at is not None and rows[blink_at[0] - top][blink_at[1] - left] != '@':
+            rows[blink_at[0] - top][blink_at[1] - left] = self.region_icon(*blink_at, blinking=True)
         rows = [''.join(row) for row in rows]
         return '\n'.join(rows)
+
+
+class ActiveArea(Navigation):
+    """
+    The block of locations around the current one, where the creatures are simulated turn by turn
+    Spans config.active_area_radius locations in each direction and wraps around the world edges like movement does,
+    covering each location once in worlds that are too small for the radius.
+    Tiles, neighbors and pathing work across the borders of its locations. They take any copy of the coordinates
+    and return coordinates within the world.
+    """
+
+    def __init__(self, game_world: World, center: Location):
+        self.center = center
+        self._world = game_world
+        radius = config.active_area_radius
+        self._world_size = game_world.size
+        world_height, world_width = self._world_size
+        rows = min(2 * radius + 1, world_height // config.location_height)
+        columns = min(2 * radius + 1, world_width // config.location_width)
+        self._top_left = (center.top_left[0] - radius * config.location_height,
+                          center.top_left[1] - radius * config.location_width)
+        self._bottom_right = (self._top_left[0] + rows * config.location_height,
+                              self._top_left[1] + columns * config.location_width)
+        self.locations: dict[tuple[int, int], Location] = {}
+        for row in range(self._top_left[0], self._bottom_right[0], config.location_height):
+            for column in range(self._top_left[1], self._bottom_right[1], config.location_width):
+                top_left = self.wrap_coords((row, column))
+                self.locations[top_left] = game_world.get_location(top_left)
+
+    @property
+    def bounds(self) -> tuple[tuple[int, int], tuple[int, int]]:
+        """The bounds before wrapping, the top left can be outside the world"""
+        return self._top_left, self._bottom_right
+
+    def contains_coords(self, coords: tuple[int, int]) -> bool:
+        (top, left), (bottom, right) = self._top_left, self._bottom_right
+        return (coords[0] - top) % self._world_size[0] < bottom - top \
+            and (coords[1] - left) % self._world_size[1] < right - left
+
+    def wrap_coords(self, coords: tuple[int, int]) -> tuple[int, int]:
+        return coords[0] % self._world_size[0], coords[1] % self._world_size[1]
+
+    def nearest_coords(self, origin: tuple[int, int], coords: tuple[int, int]) -> tuple[int, int]:
+        height, width = self._world_size
+        return (origin[0] + (coords[0] - origin[0] + height // 2) % height - height // 2,
+                origin[1] + (coords[1] - origin[1] + width // 2) % width - width // 2)
+
+    def _covering_radius(self, coords: tuple[int, int]) -> int:
+        (top, left), (bottom, right) = self._top_left, self._bottom_right
+        row = (coords[0] - top) % self._world_size[0]
+        column = (coords[1] - left) % self._world_size[1]
+        return max(row, bottom - top - 1 - row, column, right - left - 1 - column)
+
+    def location_at(self, coords: tuple[int, int]) -> Location:
+        if not self.contains_coords(coords):
+            raise ValueError(f'Bad coordinates {coords} for ActiveArea location!')
+        row, column = self.wrap_coords(coords)
+        return self.locations[(row - row % config.location_height, column - column % config.location_width)]
+
+    def tile_at(self, coords: tuple[int, int]) -> Tile:
+        coords = self.wrap_coords(coords)
+        return self.location_at(coords).tile_at(coords)
+
+    def passage_cost(self, creature: Creature, coords: tuple[int, int]) -> int:
+        coords = self.wrap_coords(coords)
+        return self.location_at(coords).passage_cost(creature, coords)
+
+    def has_free_slot(self, coords: tuple[int, int]) -> bool:
+        coords = self.wrap_coords(coords)
+        return self.location_at(coords).has_free_slot(coords)
+
+    def _all_neighbors(self, coords: tuple[int, int]) -> tuple[tuple[int, int], ...]:
+        if not self.contains_coords(coords):
+            raise ValueError(f'Bad coordinates {coords} for ActiveArea neighbors!')
+        return neighbor_table(*self.bounds, self._world_size)[self.wrap_coords(coords)]